@@ -10,7 +10,11 @@ import sys
 
 import whisper
 
-AVAILABLE_MODELS = ["tiny", "base", "small", "medium", "large", "large-v2", "large-v3"]
+from src.config import FASTER_WHISPER_ONLY_MODELS, WHISPER_MODELS
+
+# Los mismos modelos que admite el CLI, salvo los exclusivos de faster-whisper (este script descarga con openai-whisper)
+AVAILABLE_MODELS = tuple(model for model in WHISPER_MODELS if model not in FASTER_WHISPER_ONLY_MODELS)
+AVAILABLE_MODELS_SET = frozenset(AVAILABLE_MODELS)
 
 MODEL_SIZES = {
     "tiny": "~39 MB",
@@ -18,14 +22,14 @@ MODEL_SIZES = {
     "small": "~244 MB",
     "medium": "~769 MB",
     "large": "~1550 MB",
-    "large-v2": "~1550 MB",
     "large-v3": "~1550 MB",
+    "large-v3-turbo": "~809 MB",
 }
 
 
 def download_model(model_name: str, download_root: str = None):
     """Descarga un modelo de Whisper."""
-    if model_name not in AVAILABLE_MODELS:
+    if model_name not in AVAILABLE_MODELS_SET:
         print(f"❌ Modelo '{model_name}' no válido.")
         print(f"Modelos disponibles: {', '.join(AVAILABLE_MODELS)}")
         return False
@@ -71,8 +75,8 @@ Modelos disponibles (ordenados por tamaño):
   small     ~244 MB   - Buena precisión, velocidad aceptable
   medium    ~769 MB   - Alta precisión, más lento
   large     ~1550 MB  - Máxima precisión, muy lento
-  large-v2  ~1550 MB  - Versión mejorada de large
   large-v3  ~1550 MB  - Versión más reciente de large
+  large-v3-turbo ~809 MB - large-v3 con decoder reducido, mucho más rápido
 
 Variables de entorno:
   WHISPER_MODEL_DIR   Directorio donde buscar/guardar modelos
@@ -2,24 +2,256 @@
 Funciones para procesamiento de audio: extracción, VAD, y análisis de pistas.
 """
 
+import hashlib
+import itertools
+import json
+import math
 import os
+import re
+import selectors
+import shutil
 import subprocess
 import tempfile
 import wave
-from typing import Any, Dict, List, Optional, Tuple
+from functools import cached_property
+from types import MappingProxyType
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
+import numpy as np
 import webrtcvad
-from pydub import AudioSegment
-from pymediainfo import MediaInfo
 
 from .config import (
     AUDIO_CHANNELS,
     AUDIO_SAMPLE_RATE,
+    ISO639_2_BIBLIOGRAPHIC_TO_TERMINOLOGIC,
+    ISO639_2_TO_WHISPER,
+    SILENCE_REMOVE_FILTER,
     VAD_AGGRESSIVENESS,
+    VAD_BACKEND,
+    VAD_ENERGY_THRESHOLD_DBFS,
     VAD_FRAME_DURATION,
+    VAD_MAX_VOICED_DURATION,
+    VAD_MAX_ZERO_CROSSING_RATE,
     VAD_MIN_VOICE_PERCENTAGE,
+    get_probe_cache_dir,
 )
 
+# Palabras clave en el título que indican que la pista debe ser ignorada
+_IGNORE_TRACK_KEYWORDS = (
+    "comment",
+    "coment",
+    "director",
+    "interview",
+    "entrevista",
+    "behind",
+    "making",
+    "extras",
+    "bonus",
+    "special",
+    "isolated",
+    "music score",
+    "soundtrack",
+    "instrumental",
+)
+# Todas las palabras clave en un único patrón para recorrer el título una sola vez
+_IGNORE_TRACK_RE = re.compile("|".join(map(re.escape, _IGNORE_TRACK_KEYWORDS)))
+
+# Nombres de formato de MediaInfo para los códecs de ffprobe, para mantener los valores de "codec" de la salida
+# (los PCM se agrupan aparte; los códecs no listados se muestran con el nombre de ffprobe en mayúsculas)
+_MEDIAINFO_CODEC_NAMES = MappingProxyType(
+    {
+        "aac": "AAC",
+        "ac3": "AC-3",
+        "eac3": "E-AC-3",
+        "truehd": "MLP FBA",
+        "mlp": "MLP",
+        "dts": "DTS",
+        "flac": "FLAC",
+        "alac": "ALAC",
+        "opus": "Opus",
+        "vorbis": "Vorbis",
+        "mp1": "MPEG Audio",
+        "mp2": "MPEG Audio",
+        "mp3": "MPEG Audio",
+        "wmav1": "WMA",
+        "wmav2": "WMA",
+        "wmapro": "WMA",
+    }
+)
+
+
+# Variantes que MediaInfo nombra aparte, identificadas por el perfil que da ffprobe (p.ej. DTS-HD MA es "DTS XLL")
+_MEDIAINFO_PROFILE_NAMES = MappingProxyType(
+    {
+        ("dts", "DTS-ES"): "DTS ES",
+        ("dts", "DTS 96/24"): "DTS 96/24",
+        ("dts", "DTS-HD HRA"): "DTS XBR",
+        ("dts", "DTS-HD MA"): "DTS XLL",
+        ("dts", "DTS-HD MA + DTS:X"): "DTS XLL X",
+        ("dts", "DTS-HD MA + DTS:X IMAX"): "DTS XLL X",
+        ("dts", "DTS Express"): "DTS LBR",
+        ("eac3", "Dolby Digital Plus + Dolby Atmos"): "E-AC-3 JOC",
+        ("truehd", "Dolby TrueHD + Dolby Atmos"): "MLP FBA 16-ch",
+    }
+)
+
+
+def _mediainfo_codec_name(codec_name: Optional[str], profile: Optional[str] = None) -> Optional[str]:
+    """Convierte un nombre de códec (y perfil) de ffprobe al nombre de formato que usa MediaInfo."""
+    if not codec_name:
+        return None
+    if codec_name.startswith("pcm_"):
+        return "PCM"
+    profile_name = _MEDIAINFO_PROFILE_NAMES.get((codec_name, profile))
+    if profile_name:
+        return profile_name
+    return _MEDIAINFO_CODEC_NAMES.get(codec_name, codec_name.upper())
+
+
+# Rutas absolutas de ffmpeg/ffprobe: con un ejecutable absoluto y close_fds=False, subprocess lanza el
+# proceso con posix_spawn en lugar de fork, evitando duplicar la tabla de páginas de un proceso que ya
+# tiene el modelo de Whisper cargado (los descriptores de Python no son heredables por defecto)
+_FFMPEG = shutil.which("ffmpeg") or "ffmpeg"
+_FFPROBE = shutil.which("ffprobe") or "ffprobe"
+
+# Bytes que se leen de cada pipe por llamada (el tamaño del buffer de un pipe en Linux)
+_PIPE_READ_SIZE = 64 * 1024
+
+
+def _read_pipes(fds: Sequence[int]) -> Dict[int, bytes]:
+    """
+    Lee varios pipes hasta EOF a la vez desde el hilo actual, con un selector.
+
+    Args:
+        fds: Descriptores de lectura de los pipes (no se cierran)
+
+    Returns:
+        Diccionario {descriptor: contenido leído}
+    """
+    chunks: Dict[int, List[bytes]] = {fd: [] for fd in fds}
+    with selectors.DefaultSelector() as selector:
+        for fd in fds:
+            selector.register(fd, selectors.EVENT_READ)
+        while selector.get_map():
+            for key, _ in selector.select():
+                chunk = os.read(key.fd, _PIPE_READ_SIZE)
+                if chunk:
+                    chunks[key.fd].append(chunk)
+                else:
+                    selector.unregister(key.fd)
+    return {fd: b"".join(fd_chunks) for fd, fd_chunks in chunks.items()}
+
+
+def _load_probe_cache(cache_path: str, cache_key: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Devuelve la salida de ffprobe cacheada si la entrada corresponde al mismo archivo sin cambios."""
+    try:
+        with open(cache_path, "r", encoding="utf-8") as cache_file:
+            entry = json.load(cache_file)
+    except (OSError, ValueError):
+        return None
+
+    if not isinstance(entry, dict) or entry.get("key") != cache_key:
+        return None
+    return entry.get("probe")
+
+
+def _store_probe_cache(cache_path: str, cache_key: Dict[str, Any], probe: Dict[str, Any]) -> None:
+    """Guarda la salida de ffprobe en la caché (escritura atómica; los errores se ignoran)."""
+    temp_path = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        with open(temp_path, "w", encoding="utf-8") as cache_file:
+            json.dump({"key": cache_key, "probe": probe}, cache_file, separators=(",", ":"))
+        os.replace(temp_path, cache_path)
+    except OSError:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+# Tamaño de los frames de VAD, fijo porque el PCM siempre llega a AUDIO_SAMPLE_RATE en 16-bit mono
+_FRAME_SAMPLES = AUDIO_SAMPLE_RATE * VAD_FRAME_DURATION // 1000
+_FRAME_BYTES = _FRAME_SAMPLES * 2
+
+# Umbral de energía del VAD por energía, como potencia media sobre muestras int16
+_ENERGY_THRESHOLD = (32768.0**2) * 10 ** (VAD_ENERGY_THRESHOLD_DBFS / 10)
+
+# Instancias de VAD reutilizables, una por nivel de agresividad
+_VAD_CACHE: Dict[int, webrtcvad.Vad] = {}
+
+
+def _is_speech(vad: webrtcvad.Vad, frame: memoryview, sample_rate: int) -> bool:
+    """Clasifica un frame con webrtcvad; si la detección falla, el frame se conserva."""
+    try:
+        return vad.is_speech(frame, sample_rate)
+    except Exception:
+        return True
+
+
+def _webrtc_speech_mask(frames: np.ndarray, aggressiveness: int, accept_threshold: int, stop_threshold: int) -> Tuple[np.ndarray, int]:
+    """
+    Clasifica los frames con webrtcvad, deteniéndose en cuanto la decisión está tomada.
+
+    Args:
+        frames: Frames PCM int16 con forma (n_frames, _FRAME_SAMPLES)
+        aggressiveness: Nivel de agresividad del VAD (0-3)
+        accept_threshold: Frames con voz necesarios para aceptar la muestra
+        stop_threshold: Frames con voz a partir de los cuales se deja de analizar
+
+    Returns:
+        Tupla (máscara de voz, frames analizados)
+    """
+    # Reutilizar la instancia de VAD para este nivel de agresividad
+    vad = _VAD_CACHE.get(aggressiveness)
+    if vad is None:
+        vad = _VAD_CACHE[aggressiveness] = webrtcvad.Vad(aggressiveness)
+
+    total_frames = len(frames)
+    speech_mask = np.zeros(total_frames, dtype=bool)
+    voiced_count = 0
+    analyzed_frames = 0
+    # webrtcvad acepta cualquier objeto buffer: se le pasan vistas sobre el PCM original en lugar de
+    # copiar cada frame a un bytes nuevo
+    pcm_view = memoryview(np.ascontiguousarray(frames)).cast("B")
+    for analyzed_frames, offset in enumerate(range(0, total_frames * _FRAME_BYTES, _FRAME_BYTES), start=1):
+        frame = pcm_view[offset : offset + _FRAME_BYTES]
+        if _is_speech(vad, frame, AUDIO_SAMPLE_RATE):
+            speech_mask[analyzed_frames - 1] = True
+            voiced_count += 1
+            if voiced_count >= stop_threshold:
+                break
+        elif voiced_count + (total_frames - analyzed_frames) < accept_threshold:
+            # Ni aunque todo lo restante fuera voz se alcanzaría el mínimo
+            break
+
+    return speech_mask, analyzed_frames
+
+
+def _energy_speech_mask(frames: np.ndarray, stop_threshold: int) -> Tuple[np.ndarray, int]:
+    """
+    Clasifica los frames por energía y tasa de cruces por cero, en una sola pasada vectorizada.
+
+    Un frame se considera voz si su energía supera VAD_ENERGY_THRESHOLD_DBFS y su tasa de
+    cruces por cero no llega a VAD_MAX_ZERO_CROSSING_RATE (el ruido de banda ancha cruza mucho más).
+
+    Args:
+        frames: Frames PCM int16 con forma (n_frames, _FRAME_SAMPLES)
+        stop_threshold: Frames con voz a partir de los cuales se descarta el resto
+
+    Returns:
+        Tupla (máscara de voz, frames analizados)
+    """
+    energy = np.mean(np.square(frames, dtype=np.float32), axis=1)
+    signs = np.signbit(frames)
+    zero_crossing_rate = np.mean(signs[:, 1:] != signs[:, :-1], axis=1)
+    speech_mask = (energy > _ENERGY_THRESHOLD) & (zero_crossing_rate < VAD_MAX_ZERO_CROSSING_RATE)
+
+    # Igual que con webrtcvad, no se usa más voz de la necesaria
+    reached = int(np.searchsorted(np.cumsum(speech_mask), stop_threshold))
+    if reached < len(frames):
+        speech_mask[reached + 1 :] = False
+        return speech_mask, reached + 1
+
+    return speech_mask, len(frames)
+
 
 class AudioTools:
     """Clase para manejar el procesamiento de audio de archivos de video."""
@@ -36,6 +268,14 @@ class AudioTools:
         self.video_path = video_path
         self.debug = debug
         self.temp_dir = temp_dir
+        self._duration: Optional[float] = None
+
+        # Asegurar el directorio temporal una sola vez y precalcular el prefijo de los archivos de salida
+        self._vad_output_prefix: Optional[str] = None
+        self._vad_output_counter = itertools.count()
+        if temp_dir:
+            os.makedirs(temp_dir, exist_ok=True)
+            self._vad_output_prefix = os.path.join(temp_dir, "vad_output_")
 
     @staticmethod
     def should_ignore_track(title: Optional[str]) -> bool:
@@ -51,111 +291,172 @@ class AudioTools:
         if not title:
             return False
 
-        title_lower = title.lower()
-
-        # Palabras clave que indican que la pista debe ser ignorada
-        ignore_keywords = [
-            "comment",
-            "coment",
-            "director",
-            "interview",
-            "entrevista",
-            "behind",
-            "making",
-            "extras",
-            "bonus",
-            "special",
-            "isolated",
-            "music score",
-            "soundtrack",
-            "instrumental",
-        ]
+        return _IGNORE_TRACK_RE.search(title.lower()) is not None
+
+    @staticmethod
+    def normalize_language(code: Optional[str]) -> Optional[str]:
+        """
+        Normaliza un código de idioma de los metadatos al formato que usa Whisper.
+
+        ffprobe devuelve códigos ISO 639-2 (a veces bibliográficos, p.ej. 'fre'). Se convierten
+        a ISO 639-1 cuando Whisper conoce el idioma; en otro caso se conserva el código de 3 letras
+        (p.ej. 'und' o 'zxx').
+
+        Args:
+            code: Código de idioma tal como aparece en los metadatos (puede ser None)
+
+        Returns:
+            Código normalizado, o None si no hay idioma
+        """
+        if not code:
+            return None
+
+        code = code.lower()
+        code = ISO639_2_BIBLIOGRAPHIC_TO_TERMINOLOGIC.get(code, code)
+        return ISO639_2_TO_WHISPER.get(code, code)
+
+    @cached_property
+    def _probe(self) -> Dict[str, Any]:
+        """
+        Información de streams y formato del video, obtenida con una única llamada a ffprobe.
+
+        El resultado se cachea en disco junto con el mtime y el tamaño del archivo, de modo que
+        ejecuciones posteriores sobre el mismo video sin cambios no vuelven a lanzar ffprobe.
+        """
+        try:
+            stat = os.stat(self.video_path)
+        except OSError:
+            return self.__run_ffprobe()
+
+        real_path = os.path.realpath(self.video_path)
+        cache_path = os.path.join(get_probe_cache_dir(), hashlib.sha1(os.fsencode(real_path)).hexdigest() + ".json")
+        cache_key = {"path": real_path, "mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
+
+        probe = _load_probe_cache(cache_path, cache_key)
+        if probe is not None:
+            if self.debug:
+                print(f"  🐛 [DEBUG] Información de ffprobe leída de caché: {cache_path}")
+            return probe
+
+        probe = self.__run_ffprobe()
+        if probe:
+            _store_probe_cache(cache_path, cache_key, probe)
+        return probe
 
-        for keyword in ignore_keywords:
-            if keyword in title_lower:
-                return True
+    def __run_ffprobe(self) -> Dict[str, Any]:
+        """Ejecuta ffprobe y devuelve su salida JSON parseada, o un diccionario vacío si falla."""
+        cmd = [_FFPROBE, "-v", "error", "-print_format", "json", "-show_streams", "-show_format", self.video_path]
 
-        return False
+        result = subprocess.run(cmd, capture_output=True, check=False, close_fds=False)
+
+        if result.returncode != 0:
+            print(f"  ❌ Error al analizar el archivo con ffprobe: {result.stderr.decode('utf-8', errors='replace')}")
+            return {}
+
+        output = result.stdout
+        try:
+            # json acepta bytes directamente; solo se decodifica a mano si hay unicode inválido en los metadatos
+            return json.loads(output)
+        except UnicodeDecodeError:
+            output = output.decode("utf-8", errors="replace")
+        except ValueError:
+            return {}
+
+        try:
+            return json.loads(output)
+        except ValueError:
+            return {}
 
     def get_audio_tracks(self) -> List[Dict[str, Any]]:
         """Obtiene información de las pistas de audio del video."""
         print(f"📹 Analizando archivo: {self.video_path}")
 
-        # Usar 'replace' para manejar caracteres unicode inválidos en metadatos
-        media_info = MediaInfo.parse(self.video_path, encoding_errors="replace")
+        audio_streams = [stream for stream in self._probe.get("streams", []) if stream.get("codec_type") == "audio"]
         audio_tracks = []
-        audio_index = 0  # Contador para índice de audio en ffmpeg (0:a:X)
-
-        for track in media_info.tracks:
-            if track.track_type == "Audio":
-                # Extraer título/nombre de la pista
-                title = None
-                if hasattr(track, "title") and track.title:
-                    title = track.title
-                elif hasattr(track, "tag_title") and track.tag_title:
-                    title = track.tag_title
-                elif hasattr(track, "tag_name") and track.tag_name:
-                    title = track.tag_name
-                elif hasattr(track, "name") and track.name:
-                    title = track.name
-
-                # Verificar si la pista debe ser ignorada
-                should_ignore = self.should_ignore_track(title)
-
-                track_info = {
-                    "id": audio_index,  # Usar contador secuencial para ffmpeg
-                    "stream_order": track.stream_order,
-                    "language": track.language if hasattr(track, "language") else None,
-                    "codec": track.format,
-                    "channels": track.channel_s,
-                    "title": title,
-                    "should_ignore": should_ignore,
-                }
-                audio_tracks.append(track_info)
-
-                lang_status = track_info["language"] if track_info["language"] else "sin idioma"
-                title_info = f" - Título: {title}" if title else ""
-                ignore_status = " [IGNORAR]" if should_ignore else ""
-                print(f"  🔊 Pista {track_info['id']}: {track_info['codec']} - Idioma: {lang_status}{title_info}{ignore_status}")
-
-                audio_index += 1
+
+        # El índice en la lista coincide con el índice de audio en ffmpeg (0:a:X)
+        for audio_index, stream in enumerate(audio_streams):
+            # Las claves de las etiquetas varían en mayúsculas según el contenedor
+            tags = {key.lower(): value for key, value in stream.get("tags", {}).items()}
+
+            # Extraer título/nombre de la pista
+            title = tags.get("title") or tags.get("name")
+
+            # Verificar si la pista debe ser ignorada
+            should_ignore = self.should_ignore_track(title)
+
+            track_info = {
+                "id": audio_index,
+                # Mismos tipos y valores que daba MediaInfo: StreamOrder como texto y nombre de formato del códec
+                "stream_order": str(stream["index"]) if "index" in stream else None,
+                # El demuxer de matroska omite la etiqueta cuando el idioma es "und": se repone, como hacía MediaInfo
+                "language": self.normalize_language(tags.get("language") or "und"),
+                "codec": _mediainfo_codec_name(stream.get("codec_name"), stream.get("profile")),
+                "channels": stream.get("channels"),
+                "title": title,
+                "should_ignore": should_ignore,
+            }
+            audio_tracks.append(track_info)
+
+            lang_status = track_info["language"] if track_info["language"] else "sin idioma"
+            title_info = f" - Título: {title}" if title else ""
+            ignore_status = " [IGNORAR]" if should_ignore else ""
+            print(f"  🔊 Pista {track_info['id']}: {track_info['codec']} - Idioma: {lang_status}{title_info}{ignore_status}")
 
         return audio_tracks
 
-    def get_video_duration(self) -> Optional[float]:
-        """Obtiene la duración del video en segundos."""
-        cmd = ["ffprobe", "-v", "error", "-show_entries", "format=duration", "-of", "default=noprint_wrappers=1:nokey=1", self.video_path]
+    def _decoder_options(self, audio_track_ids: Sequence[int]) -> List[str]:
+        """
+        Opciones de decodificación de ffmpeg (van antes de -i) para las pistas de audio indicadas.
 
-        result = subprocess.run(cmd, capture_output=True, text=True, errors="replace", check=False)
+        En DTS-HD MA/HRA solo se decodifica el núcleo DTS con pérdida: las extensiones suponen la mayor parte
+        del coste de decodificación y no aportan nada a una muestra mono a 16 kHz.
+        """
+        audio_streams = [stream for stream in self._probe.get("streams", []) if stream.get("codec_type") == "audio"]
+        if any(audio_track_id < len(audio_streams) and audio_streams[audio_track_id].get("codec_name") == "dts" for audio_track_id in audio_track_ids):
+            # Es una opción privada del decodificador dca: el resto de decodificadores de la entrada la ignoran
+            return ["-core_only", "1"]
+        return []
 
-        if result.returncode == 0:
+    def get_video_duration(self) -> Optional[float]:
+        """Obtiene la duración del video en segundos (se calcula una sola vez por instancia)."""
+        if self._duration is None:
             try:
-                return float(result.stdout.strip())
-            except ValueError:
+                self._duration = float(self._probe["format"]["duration"])
+            except (KeyError, TypeError, ValueError):
                 return None
-        return None
+        return self._duration
 
-    def extract_audio_sample(self, audio_track_id: int, duration: int = 30, start_time: int = 0) -> Optional[str]:
-        """Extrae una muestra de audio de la pista especificada."""
-        print(f"  ⏺️  Extrayendo muestra de audio (pista {audio_track_id}, desde {start_time}s, duración {duration}s)...")
+    def extract_audio_sample(self, audio_track_id: int, duration: int = 30, start_time: int = 0, strip_silence: bool = False) -> Optional[bytes]:
+        """
+        Extrae una muestra de audio de la pista especificada.
 
-        # Usar directorio temporal específico si se proporciona
-        if self.temp_dir:
-            output_path = os.path.join(self.temp_dir, f"audio_track{audio_track_id}_t{start_time}s.wav")
-        else:
-            with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as tmp_file:
-                output_path = tmp_file.name
+        El audio se lee directamente de la salida estándar de ffmpeg como PCM
+        16-bit mono a AUDIO_SAMPLE_RATE, sin pasar por archivos intermedios.
 
-        if self.debug:
-            print(f"  🐛 [DEBUG] Archivo temporal de audio creado: {output_path}")
+        Args:
+            audio_track_id: Índice de la pista de audio (0:a:X)
+            duration: Duración de la muestra en segundos
+            start_time: Tiempo de inicio en segundos
+            strip_silence: Si es True, ffmpeg elimina los tramos largos de silencio (SILENCE_REMOVE_FILTER)
+                           antes de entregar el audio, reduciendo el trabajo del VAD en muestras largas
+
+        Returns:
+            Bytes PCM (s16le) de la muestra, o None si falla la extracción
+        """
+        print(f"  ⏺️  Extrayendo muestra de audio (pista {audio_track_id}, desde {start_time}s, duración {duration}s)...")
 
         # Extraer muestra de audio usando ffmpeg
         cmd = [
-            "ffmpeg",
+            _FFMPEG,
+            "-loglevel",
+            "error",  # Solo errores en stderr: el progreso no se usa para nada
+            "-nostats",
             "-fflags",
             "+genpts",  # Generar timestamps si faltan
             "-ss",
             str(start_time),  # Tiempo de inicio
+            *self._decoder_options([audio_track_id]),
             "-i",
             self.video_path,
             "-map",
@@ -166,131 +467,211 @@ class AudioTools:
             str(AUDIO_SAMPLE_RATE),  # Whisper usa 16kHz
             "-ac",
             str(AUDIO_CHANNELS),  # Mono
-            "-y",
-            output_path,
+        ]
+        if strip_silence:
+            cmd += ["-af", SILENCE_REMOVE_FILTER]
+        cmd += [
+            "-f",
+            "s16le",  # PCM crudo, es lo que consume webrtcvad
+            "-acodec",
+            "pcm_s16le",
+            "-",
         ]
 
-        result = subprocess.run(cmd, capture_output=True, text=True, errors="replace", check=False)
+        result = subprocess.run(cmd, capture_output=True, check=False, close_fds=False)
 
         if result.returncode != 0:
-            print(f"  ❌ Error al extraer audio: {result.stderr}")
+            print(f"  ❌ Error al extraer audio: {result.stderr.decode('utf-8', errors='replace')}")
             return None
 
-        return output_path
+        if self.debug:
+            print(f"  🐛 [DEBUG] Muestra de audio extraída en memoria: {len(result.stdout)} bytes")
 
-    def apply_vad(self, audio_path: str, aggressiveness: int = VAD_AGGRESSIVENESS) -> Tuple[Optional[str], float]:
+        return result.stdout
+
+    def extract_audio_samples(self, audio_track_id: int, start_times: Sequence[int], duration: int) -> List[Optional[bytes]]:
         """
-        Aplica Voice Activity Detection para quedarse solo con segmentos con voz.
+        Extrae varias muestras de audio de la pista con un único proceso ffmpeg.
 
         Args:
-            audio_path: Ruta al archivo de audio WAV
-            aggressiveness: Nivel de agresividad del VAD (0-3, 3 más agresivo)
+            audio_track_id: Índice de la pista de audio (0:a:X)
+            start_times: Tiempos de inicio de cada muestra en segundos
+            duration: Duración de cada muestra en segundos
 
         Returns:
-            Tupla (ruta_audio, porcentaje_voz) donde:
-            - ruta_audio: Ruta al archivo con solo voz, o None si falla
-            - porcentaje_voz: Porcentaje de frames con voz detectada
+            Lista con el PCM (s16le) de cada muestra en el orden de start_times, None en las que fallen
         """
-        print("  🎙️  Aplicando VAD para filtrar silencios/ruido...")
+        return self.extract_tracks_audio_samples([audio_track_id], start_times, duration)[audio_track_id]
 
-        try:
-            # Cargar el audio con pydub
-            audio = AudioSegment.from_wav(audio_path)
-
-            # Convertir a 16kHz mono si no lo está ya
-            if audio.frame_rate != AUDIO_SAMPLE_RATE:
-                audio = audio.set_frame_rate(AUDIO_SAMPLE_RATE)
-            if audio.channels != AUDIO_CHANNELS:
-                audio = audio.set_channels(AUDIO_CHANNELS)
-
-            # Exportar temporalmente para procesar con webrtcvad
-            if self.temp_dir:
-                temp_normalized_path = os.path.join(self.temp_dir, f"vad_normalized_{os.path.basename(audio_path)}")
-                temp_normalized = type("obj", (object,), {"name": temp_normalized_path})()
-            else:
-                temp_normalized = tempfile.NamedTemporaryFile(suffix=".wav", delete=False)
-                temp_normalized.close()
+    def extract_tracks_audio_samples(self, audio_track_ids: Sequence[int], start_times: Sequence[int], duration: int) -> Dict[int, List[Optional[bytes]]]:
+        """
+        Extrae las mismas muestras de audio de varias pistas con un único proceso ffmpeg.
 
-            audio.export(temp_normalized.name, format="wav")
+        Cada muestra es una entrada con su propio -ss (búsqueda rápida por índice, sin decodificar
+        lo anterior) de la que se mapean todas las pistas, así que cada ventana del contenedor se lee
+        una sola vez para todas ellas; cada par (pista, muestra) tiene una salida PCM propia escrita
+        en un pipe independiente. Las posiciones repetidas (p.ej. en videos cortos) se extraen una sola vez.
 
-            if self.debug:
-                print(f"  🐛 [DEBUG] Archivo temporal normalizado creado: {temp_normalized.name}")
+        Args:
+            audio_track_ids: Índices de las pistas de audio (0:a:X)
+            start_times: Tiempos de inicio de cada muestra en segundos
+            duration: Duración de cada muestra en segundos
 
-            # Leer el audio normalizado
-            with wave.open(temp_normalized.name, "rb") as wf:
-                sample_rate = wf.getframerate()
-                audio_data = wf.readframes(wf.getnframes())
+        Returns:
+            Diccionario {pista: lista con el PCM (s16le) de cada muestra en el orden de start_times, None en las que fallen}
+        """
+        unique_starts = list(dict.fromkeys(start_times))
+        print(f"  ⏺️  Extrayendo {len(unique_starts)} muestra(s) de audio (pista(s) {list(audio_track_ids)}, desde {unique_starts}s, duración {duration}s)...")
 
-            # Inicializar VAD
-            vad = webrtcvad.Vad(aggressiveness)
+        cmd = [_FFMPEG, "-loglevel", "error", "-nostats"]
+        decoder_options = self._decoder_options(audio_track_ids)
+        for start_time in unique_starts:
+            cmd += ["-fflags", "+genpts", "-ss", str(start_time), "-t", str(duration), *decoder_options, "-i", self.video_path]
 
-            # Procesar en frames de 30ms (requerido por webrtcvad)
-            frame_size = int(sample_rate * VAD_FRAME_DURATION / 1000) * 2
+        output_keys = [(audio_track_id, start_time) for audio_track_id in audio_track_ids for start_time in unique_starts]
+        pipes: List[Tuple[int, int]] = []
+        try:
+            for audio_track_id, start_time in output_keys:
+                read_fd, write_fd = os.pipe()
+                pipes.append((read_fd, write_fd))
+                cmd += [
+                    "-map",
+                    f"{unique_starts.index(start_time)}:a:{audio_track_id}",
+                    "-ar",
+                    str(AUDIO_SAMPLE_RATE),
+                    "-ac",
+                    str(AUDIO_CHANNELS),
+                    "-f",
+                    "s16le",
+                    "-acodec",
+                    "pcm_s16le",
+                    f"pipe:{write_fd}",
+                ]
+
+            # pass_fds impide usar posix_spawn, pero _posixsubprocess ya recurre a vfork en Linux
+            write_fds = [write_fd for _, write_fd in pipes]
+            process = subprocess.Popen(cmd, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, pass_fds=write_fds)
+        except BaseException:
+            # Si ffmpeg no llega a arrancar, nadie leerá los pipes
+            for read_fd, _ in pipes:
+                os.close(read_fd)
+            raise
+        finally:
+            for _, write_fd in pipes:
+                os.close(write_fd)
+
+        # ffmpeg escribe las salidas intercaladas: hay que vaciar todos los pipes (y stderr) a la vez para no
+        # bloquearlo; un selector lo hace desde este hilo, sin un hilo lector por pipe
+        read_fds = [read_fd for read_fd, _ in pipes]
+        with process:
+            try:
+                stderr_fd = process.stderr.fileno()
+                outputs = _read_pipes([*read_fds, stderr_fd])
+            finally:
+                # Cerrar los pipes antes de esperar: si la lectura falla, ffmpeg termina en lugar de bloquearse
+                for read_fd in read_fds:
+                    os.close(read_fd)
+            process.wait()
+        stderr = outputs.pop(stderr_fd)
+        samples = dict(zip(output_keys, (outputs[read_fd] for read_fd in read_fds)))
+
+        if process.returncode != 0:
+            print(f"  ❌ Error al extraer audio: {stderr.decode('utf-8', errors='replace')}")
+            print("  ℹ️  Reintentando la extracción muestra a muestra...")
+            samples = {key: self.extract_audio_sample(key[0], duration, key[1]) for key in output_keys}
+        elif self.debug:
+            print(f"  🐛 [DEBUG] Muestras de audio extraídas en memoria: {[len(sample) for sample in samples.values()]} bytes")
+
+        return {audio_track_id: [samples[(audio_track_id, start_time)] for start_time in start_times] for audio_track_id in audio_track_ids}
+
+    def apply_vad(
+        self,
+        pcm: bytes,
+        aggressiveness: int = VAD_AGGRESSIVENESS,
+        max_voiced_duration: float = VAD_MAX_VOICED_DURATION,
+    ) -> Tuple[Optional[np.ndarray], float]:
+        """
+        Aplica Voice Activity Detection para quedarse solo con segmentos con voz.
 
-            voiced_frames = []
-            total_frames = 0
-            voiced_count = 0
+        El análisis se detiene en cuanto la decisión está tomada: al reunir max_voiced_duration
+        segundos de voz (si la muestra ya supera el mínimo), o cuando el mínimo de voz ya no
+        se puede alcanzar con los frames restantes.
 
-            # Procesar cada frame
-            for i in range(0, len(audio_data), frame_size):
-                frame = audio_data[i : i + frame_size]
+        Args:
+            pcm: Audio PCM 16-bit mono a AUDIO_SAMPLE_RATE, tal como lo devuelve extract_audio_sample
+            aggressiveness: Nivel de agresividad del VAD (0-3, 3 más agresivo)
+            max_voiced_duration: Segundos de voz a partir de los cuales se deja de analizar
+
+        Returns:
+            Tupla (audio_voz, porcentaje_voz) donde:
+            - audio_voz: Frames con voz como float32 en [-1, 1) (el formato de Whisper), o None si falla
+            - porcentaje_voz: Porcentaje de frames con voz detectada
+        """
+        print("  🎙️  Aplicando VAD para filtrar silencios/ruido...")
 
-                # Asegurarse de que el frame tiene el tamaño correcto
-                if len(frame) < frame_size:
-                    break
+        try:
+            # Dividir el PCM en frames de 30ms (requerido por webrtcvad) como vista 2D sin copias;
+            # el último frame incompleto se descarta
+            total_frames = len(pcm) // _FRAME_BYTES
+            if total_frames == 0:
+                # Sin un solo frame completo (p.ej. ffmpeg no devolvió audio) no hay voz que analizar
+                print(f"  ⚠️  Muy poca voz detectada (< {VAD_MIN_VOICE_PERCENTAGE}%), rechazando muestra")
+                return None, 0
 
-                total_frames += 1
+            samples = np.frombuffer(pcm, dtype=np.int16, count=total_frames * _FRAME_SAMPLES)
+            frames = samples.reshape(total_frames, _FRAME_SAMPLES)
 
-                try:
-                    # Detectar si hay voz en este frame
-                    is_speech = vad.is_speech(frame, sample_rate)
+            # Frames con voz necesarios para aceptar la muestra, y a partir de los cuales no merece la pena seguir
+            accept_threshold = math.ceil(total_frames * VAD_MIN_VOICE_PERCENTAGE / 100)
+            stop_threshold = max(accept_threshold, int(max_voiced_duration * 1000 // VAD_FRAME_DURATION))
 
-                    if is_speech:
-                        voiced_frames.append(frame)
-                        voiced_count += 1
-                except Exception:
-                    # Si falla la detección, incluir el frame por defecto
-                    voiced_frames.append(frame)
+            # Detectar qué frames tienen voz
+            if VAD_BACKEND == "energy":
+                speech_mask, analyzed_frames = _energy_speech_mask(frames, stop_threshold)
+            else:
+                speech_mask, analyzed_frames = _webrtc_speech_mask(frames, aggressiveness, accept_threshold, stop_threshold)
+            voiced_count = int(speech_mask.sum())
 
             # Calcular estadísticas
-            voice_percentage = (voiced_count / total_frames * 100) if total_frames > 0 else 0
+            voice_percentage = (voiced_count / analyzed_frames * 100) if analyzed_frames > 0 else 0
             voiced_duration = (voiced_count * VAD_FRAME_DURATION) / 1000  # segundos
-            total_duration = (total_frames * VAD_FRAME_DURATION) / 1000  # segundos
+            analyzed_duration = (analyzed_frames * VAD_FRAME_DURATION) / 1000  # segundos
 
-            print(f"  📊 Voz detectada: {voice_percentage:.1f}% del audio ({voiced_count}/{total_frames} frames)")
-            print(f"  ⏱️  Duración con voz: {voiced_duration:.1f}s de {total_duration:.1f}s totales")
+            print(f"  📊 Voz detectada: {voice_percentage:.1f}% del audio ({voiced_count}/{analyzed_frames} frames)")
+            print(f"  ⏱️  Duración con voz: {voiced_duration:.1f}s de {analyzed_duration:.1f}s analizados")
+            if analyzed_frames < total_frames:
+                print(f"  ⏩ Análisis VAD detenido antes de tiempo ({analyzed_frames}/{total_frames} frames)")
 
             # Si no hay suficiente voz detectada, rechazar la muestra
             if voice_percentage < VAD_MIN_VOICE_PERCENTAGE:
                 print(f"  ⚠️  Muy poca voz detectada (< {VAD_MIN_VOICE_PERCENTAGE}%), rechazando muestra")
-                if not self.debug:
-                    os.remove(temp_normalized.name)
                 return None, voice_percentage
 
-            # Si hay voz, crear nuevo archivo solo con los frames de voz
-            if self.temp_dir:
-                output_path = os.path.join(self.temp_dir, f"vad_output_{os.path.basename(audio_path)}")
-            else:
-                with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as output_file:
-                    output_path = output_file.name
-
+            voiced_frames = frames[speech_mask]
             if self.debug:
-                print(f"  🐛 [DEBUG] Archivo temporal VAD creado: {output_path}")
-
-            with wave.open(output_path, "wb") as wf_out:
-                wf_out.setnchannels(1)
-                wf_out.setsampwidth(2)  # 16-bit
-                wf_out.setframerate(sample_rate)
-                wf_out.writeframes(b"".join(voiced_frames))
-
-            # Limpiar temporal
-            if not self.debug:
-                os.remove(temp_normalized.name)
+                # Solo en modo debug se vuelca la voz a disco, para poder escucharla
+                print(f"  🐛 [DEBUG] Archivo temporal VAD creado: {self.__write_vad_debug_wav(voiced_frames)}")
 
             print("  ✅ VAD aplicado exitosamente")
-            return output_path, voice_percentage
+            # Misma conversión que whisper.load_audio: el audio pasa a Whisper sin tocar el disco
+            return voiced_frames.reshape(-1).astype(np.float32) / 32768.0, voice_percentage
 
         except Exception as e:
             print(f"  ⚠️  Error al aplicar VAD: {e}")
             print("  ℹ️  Rechazando muestra por error en VAD")
             return None, 0
+
+    def __write_vad_debug_wav(self, voiced_frames: np.ndarray) -> str:
+        """Escribe los frames con voz en un WAV temporal y devuelve su ruta."""
+        if self._vad_output_prefix:
+            output_path = f"{self._vad_output_prefix}{next(self._vad_output_counter)}.wav"
+        else:
+            with tempfile.NamedTemporaryFile(prefix="vad_output_", suffix=".wav", delete=False) as output_file:
+                output_path = output_file.name
+
+        with wave.open(output_path, "wb") as wf_out:
+            wf_out.setnchannels(1)
+            wf_out.setsampwidth(2)  # 16-bit
+            wf_out.setframerate(AUDIO_SAMPLE_RATE)
+            wf_out.writeframes(voiced_frames)
+        return output_path
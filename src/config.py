@@ -5,107 +5,233 @@ Configuración y constantes para el detector de idiomas.
 import os
 import tempfile
 from datetime import datetime
+from functools import lru_cache
+from types import MappingProxyType
 
 # Mapeo de códigos de idioma de Whisper (ISO 639-1) a ISO 639-2/T (terminológico)
 # Usamos códigos terminológicos que son los estándares actuales
-WHISPER_TO_ISO639_2 = {
-    "en": "eng",  # Inglés
-    "es": "spa",  # Español
-    "fr": "fra",  # Francés - No "fre" (bibliográfico)
-    "de": "deu",  # Alemán - No "ger" (bibliográfico)
-    "it": "ita",  # Italiano
-    "pt": "por",  # Portugués
-    "ru": "rus",  # Ruso
-    "ja": "jpn",  # Japonés
-    "ko": "kor",  # Coreano
-    "zh": "zho",  # Chino - No "chi" (bibliográfico)
-    "ar": "ara",  # Árabe
-    "ca": "cat",  # Catalán
-    "cs": "ces",  # Checo - No "cze" (bibliográfico)
-    "da": "dan",  # Danés
-    "nl": "nld",  # Holandés - No "dut" (bibliográfico)
-    "fi": "fin",  # Finlandés
-    "el": "ell",  # Griego - No "gre" (bibliográfico)
-    "he": "heb",  # Hebreo
-    "hi": "hin",  # Hindi
-    "hu": "hun",  # Húngaro
-    "id": "ind",  # Indonesio
-    "no": "nor",  # Noruego
-    "pl": "pol",  # Polaco
-    "ro": "ron",  # Rumano - No "rum" (bibliográfico)
-    "sv": "swe",  # Sueco
-    "th": "tha",  # Tailandés
-    "tr": "tur",  # Turco
-    "uk": "ukr",  # Ucraniano
-    "vi": "vie",  # Vietnamita
-    "sq": "sqi",  # Albanés
-    "hy": "hye",  # Armenio
-    "eu": "eus",  # Vasco
-    "my": "mya",  # Birmano
-    "ka": "kat",  # Georgiano
-    "is": "isl",  # Islandés
-    "mk": "mkd",  # Macedonio
-    "mi": "mri",  # Maorí
-    "ms": "msa",  # Malayo
-    "fa": "fas",  # Persa
-    "sk": "slk",  # Eslovaco
-    "bo": "bod",  # Tibetano
-    "cy": "cym",  # Galés
-}
+# Cubre todos los idiomas de whisper.tokenizer.LANGUAGES, en el mismo orden
+WHISPER_TO_ISO639_2 = MappingProxyType(
+    {
+        "en": "eng",  # Inglés
+        "zh": "zho",  # Chino - No "chi" (bibliográfico)
+        "de": "deu",  # Alemán - No "ger" (bibliográfico)
+        "es": "spa",  # Español
+        "ru": "rus",  # Ruso
+        "ko": "kor",  # Coreano
+        "fr": "fra",  # Francés - No "fre" (bibliográfico)
+        "ja": "jpn",  # Japonés
+        "pt": "por",  # Portugués
+        "tr": "tur",  # Turco
+        "pl": "pol",  # Polaco
+        "ca": "cat",  # Catalán
+        "nl": "nld",  # Holandés - No "dut" (bibliográfico)
+        "ar": "ara",  # Árabe
+        "sv": "swe",  # Sueco
+        "it": "ita",  # Italiano
+        "id": "ind",  # Indonesio
+        "hi": "hin",  # Hindi
+        "fi": "fin",  # Finlandés
+        "vi": "vie",  # Vietnamita
+        "he": "heb",  # Hebreo
+        "uk": "ukr",  # Ucraniano
+        "el": "ell",  # Griego - No "gre" (bibliográfico)
+        "ms": "msa",  # Malayo - No "may" (bibliográfico)
+        "cs": "ces",  # Checo - No "cze" (bibliográfico)
+        "ro": "ron",  # Rumano - No "rum" (bibliográfico)
+        "da": "dan",  # Danés
+        "hu": "hun",  # Húngaro
+        "ta": "tam",  # Tamil
+        "no": "nor",  # Noruego
+        "th": "tha",  # Tailandés
+        "ur": "urd",  # Urdu
+        "hr": "hrv",  # Croata - No "scr" (bibliográfico)
+        "bg": "bul",  # Búlgaro
+        "lt": "lit",  # Lituano
+        "la": "lat",  # Latín
+        "mi": "mri",  # Maorí - No "mao" (bibliográfico)
+        "ml": "mal",  # Malayalam
+        "cy": "cym",  # Galés - No "wel" (bibliográfico)
+        "sk": "slk",  # Eslovaco - No "slo" (bibliográfico)
+        "te": "tel",  # Telugu
+        "fa": "fas",  # Persa - No "per" (bibliográfico)
+        "lv": "lav",  # Letón
+        "bn": "ben",  # Bengalí
+        "sr": "srp",  # Serbio - No "scc" (bibliográfico)
+        "az": "aze",  # Azerí
+        "sl": "slv",  # Esloveno
+        "kn": "kan",  # Canarés
+        "et": "est",  # Estonio
+        "mk": "mkd",  # Macedonio - No "mac" (bibliográfico)
+        "br": "bre",  # Bretón
+        "eu": "eus",  # Vasco - No "baq" (bibliográfico)
+        "is": "isl",  # Islandés - No "ice" (bibliográfico)
+        "hy": "hye",  # Armenio - No "arm" (bibliográfico)
+        "ne": "nep",  # Nepalí
+        "mn": "mon",  # Mongol
+        "bs": "bos",  # Bosnio
+        "kk": "kaz",  # Kazajo
+        "sq": "sqi",  # Albanés - No "alb" (bibliográfico)
+        "sw": "swa",  # Suajili
+        "gl": "glg",  # Gallego
+        "mr": "mar",  # Maratí
+        "pa": "pan",  # Panyabí
+        "si": "sin",  # Cingalés
+        "km": "khm",  # Jemer
+        "sn": "sna",  # Shona
+        "yo": "yor",  # Yoruba
+        "so": "som",  # Somalí
+        "af": "afr",  # Afrikáans
+        "oc": "oci",  # Occitano
+        "ka": "kat",  # Georgiano - No "geo" (bibliográfico)
+        "be": "bel",  # Bielorruso
+        "tg": "tgk",  # Tayiko
+        "sd": "snd",  # Sindi
+        "gu": "guj",  # Guyaratí
+        "am": "amh",  # Amárico
+        "yi": "yid",  # Yidis
+        "lo": "lao",  # Lao
+        "uz": "uzb",  # Uzbeko
+        "fo": "fao",  # Feroés
+        "ht": "hat",  # Criollo haitiano
+        "ps": "pus",  # Pastún
+        "tk": "tuk",  # Turcomano
+        "nn": "nno",  # Noruego nynorsk
+        "mt": "mlt",  # Maltés
+        "sa": "san",  # Sánscrito
+        "lb": "ltz",  # Luxemburgués
+        "my": "mya",  # Birmano - No "bur" (bibliográfico)
+        "bo": "bod",  # Tibetano - No "tib" (bibliográfico)
+        "tl": "tgl",  # Tagalo
+        "mg": "mlg",  # Malgache
+        "as": "asm",  # Asamés
+        "tt": "tat",  # Tártaro
+        "haw": "haw",  # Hawaiano - Whisper usa el código de 3 letras
+        "ln": "lin",  # Lingala
+        "ha": "hau",  # Hausa
+        "ba": "bak",  # Baskir
+        "jw": "jav",  # Javanés - Whisper usa "jw" en lugar de "jv"
+        "su": "sun",  # Sundanés
+        "yue": "yue",  # Cantonés - Whisper usa el código de 3 letras
+    }
+)
 
 # Mapeo de códigos bibliográficos obsoletos a terminológicos estándar
 # Usado para normalizar códigos que vienen de diferentes fuentes
-ISO639_2_BIBLIOGRAPHIC_TO_TERMINOLOGIC = {
-    "fre": "fra",  # Francés
-    "ger": "deu",  # Alemán
-    "chi": "zho",  # Chino
-    "cze": "ces",  # Checo
-    "dut": "nld",  # Holandés
-    "gre": "ell",  # Griego
-    "rum": "ron",  # Rumano
-    "alb": "sqi",  # Albanés
-    "arm": "hye",  # Armenio
-    "baq": "eus",  # Vasco
-    "bur": "mya",  # Birmano
-    "geo": "kat",  # Georgiano
-    "ice": "isl",  # Islandés
-    "mac": "mkd",  # Macedonio
-    "mao": "mri",  # Maorí
-    "may": "msa",  # Malayo
-    "per": "fas",  # Persa
-    "slo": "slk",  # Eslovaco
-    "tib": "bod",  # Tibetano
-    "wel": "cym",  # Galés
-}
+ISO639_2_BIBLIOGRAPHIC_TO_TERMINOLOGIC = MappingProxyType(
+    {
+        "fre": "fra",  # Francés
+        "ger": "deu",  # Alemán
+        "chi": "zho",  # Chino
+        "cze": "ces",  # Checo
+        "dut": "nld",  # Holandés
+        "gre": "ell",  # Griego
+        "rum": "ron",  # Rumano
+        "alb": "sqi",  # Albanés
+        "arm": "hye",  # Armenio
+        "baq": "eus",  # Vasco
+        "bur": "mya",  # Birmano
+        "geo": "kat",  # Georgiano
+        "ice": "isl",  # Islandés
+        "mac": "mkd",  # Macedonio
+        "mao": "mri",  # Maorí
+        "may": "msa",  # Malayo
+        "per": "fas",  # Persa
+        "slo": "slk",  # Eslovaco
+        "tib": "bod",  # Tibetano
+        "wel": "cym",  # Galés
+        "scr": "hrv",  # Croata (retirado de ISO 639-2 en 2008, pero aún aparece en metadatos)
+        "scc": "srp",  # Serbio (retirado de ISO 639-2 en 2008, pero aún aparece en metadatos)
+    }
+)
+
+# Códigos de los metadatos que Whisper no distingue o escribe de otra forma, con su equivalente en Whisper
+LANGUAGE_ALIASES_TO_WHISPER = MappingProxyType(
+    {
+        "nob": "no",  # Noruego bokmål
+        "nb": "no",  # Noruego bokmål (ISO 639-1)
+        "fil": "tl",  # Filipino, basado en el tagalo
+        "jv": "jw",  # Javanés (ISO 639-1)
+        "iw": "he",  # Hebreo (ISO 639-1 retirado)
+        "in": "id",  # Indonesio (ISO 639-1 retirado)
+    }
+)
+
+# Mapeo inverso de ISO 639-2/T a los códigos de Whisper (ISO 639-1), más los alias anteriores
+# Usado para normalizar los idiomas que vienen en los metadatos del video
+ISO639_2_TO_WHISPER = MappingProxyType({**{iso639_2: whisper_code for whisper_code, iso639_2 in WHISPER_TO_ISO639_2.items()}, **LANGUAGE_ALIASES_TO_WHISPER})
 
 # Configuración de detección
 DEFAULT_MODEL = "base"
+# Modelos admitidos; los de FASTER_WHISPER_ONLY_MODELS solo existen para faster-whisper
+WHISPER_MODELS = ("tiny", "base", "small", "medium", "large", "large-v3", "large-v3-turbo", "distil-large-v3")
+FASTER_WHISPER_ONLY_MODELS = frozenset({"distil-large-v3"})
+# Backend de inferencia de Whisper:
+# "faster-whisper": CTranslate2 con pesos INT8 (extra opcional [faster]), bastante más rápido en CPU y GPU
+# "openai-whisper": implementación de referencia en PyTorch
+# "auto": faster-whisper si está instalado, openai-whisper en caso contrario
+WHISPER_BACKEND = "auto"
+# Cuantizar dinámicamente a INT8 las capas lineales del modelo openai-whisper cuando se ejecuta en CPU
+WHISPER_CPU_INT8_QUANTIZATION = True
+# Compilar con torch.compile el cálculo del espectrograma mel en GPU (requiere torch>=2.0)
+WHISPER_COMPILE_MEL = True
+# Compilar con torch.compile el encoder del modelo openai-whisper en GPU (requiere torch>=2.0).
+# Desactivado por defecto: la compilación tarda más de lo que ahorra en los pocos lotes de un video por proceso
+WHISPER_COMPILE_ENCODER = False
+# Ejecutar una detección de prueba al cargar el modelo, para que la primera muestra no pague la inicialización de la GPU.
+# Desactivado por defecto: en una ejecución por video (como batch_analyze.sh) solo añade una inferencia más;
+# compensa en procesos que cargan el modelo una vez y analizan muchos videos
+WHISPER_WARMUP = False
 NUM_SAMPLES = 5
+# Pistas que se analizan a la vez: el modelo se usa de una en una, pero la extracción con ffmpeg y el VAD
+# de las demás corren en paralelo, así que se aprovechan los núcleos disponibles (hasta 4, para acotar la memoria)
+MAX_PARALLEL_TRACKS = max(2, min(4, os.cpu_count() or 1))
 SAMPLE_DURATION = 90  # segundos
 MIN_CONFIDENCE = 0.6  # Confianza mínima aumentada del 50% al 60%
+# Si el primer segmento de 30s supera esta confianza sin un segundo idioma relevante,
+# no se analizan los demás segmentos de la muestra
+LANGUAGE_EARLY_EXIT_CONFIDENCE = 0.95
+LANGUAGE_EARLY_EXIT_MAX_RUNNER_UP = 0.1
 
 # Códigos ISO 639-2 que indican ausencia de contenido lingüístico
-NO_LANGUAGE_CODES = [
-    "zxx",  # Sin contenido lingüístico (música, efectos de sonido)
-    "und",  # Indefinido
-    "mis",  # Misceláneo
-    "mul",  # Múltiple (mezcla de idiomas sin uno predominante)
-    "qaa",  # Código reservado/privado
-]
+NO_LANGUAGE_CODES = frozenset(
+    {
+        "zxx",  # Sin contenido lingüístico (música, efectos de sonido)
+        "und",  # Indefinido
+        "mis",  # Misceláneo
+        "mul",  # Múltiple (mezcla de idiomas sin uno predominante)
+        "qaa",  # Código reservado/privado
+    }
+)
 
 # Posiciones proporcionales para extraer muestras
-SAMPLE_POSITIONS = [0.15, 0.25, 0.35, 0.50, 0.65]
+SAMPLE_POSITIONS = (0.15, 0.25, 0.35, 0.50, 0.65)
+# Muestreos coincidentes a partir de los cuales se deja de muestrear (el resto no cambiaría el resultado):
+# con idioma asignado, muestreos que lo confirman; sin él, muestreos que detectan el mismo idioma
+EARLY_STOP_ASSIGNED_MATCHES = 2
+EARLY_STOP_UNASSIGNED_MATCHES = 3
 
 # Configuración de análisis extendido
 EXTENDED_START_PERCENT = 0.10  # Iniciar al 10%
 EXTENDED_DURATION_PERCENT = 0.80  # Duración del 80% (del 10% al 90%)
 EXTENDED_MAX_DURATION = 60 * 60  # Máximo 1 hora
+# Filtro de ffmpeg que elimina los tramos de silencio de más de 1s antes del VAD en el análisis extendido
+SILENCE_REMOVE_FILTER = "silenceremove=start_periods=1:start_threshold=-50dB:stop_periods=-1:stop_duration=1:stop_threshold=-50dB"
 
 # Configuración de VAD
+# "webrtc": webrtcvad, distingue voz de música/ruido (por defecto)
+# "energy": energía + cruces por cero vectorizado con NumPy, mucho más rápido pero menos selectivo
+VAD_BACKEND = "webrtc"
 VAD_AGGRESSIVENESS = 2  # 0-3, siendo 3 el más agresivo
 VAD_FRAME_DURATION = 30  # milisegundos
 # Porcentaje mínimo de voz para considerar el audio válido
 VAD_MIN_VOICE_PERCENTAGE = 10  # %
+# Segundos de voz a partir de los cuales el VAD deja de analizar
+# (la detección de idioma solo usa los primeros 3 fragmentos de 30s)
+VAD_MAX_VOICED_DURATION = 90  # segundos
+# Parámetros del VAD por energía
+VAD_ENERGY_THRESHOLD_DBFS = -40  # dBFS, energía mínima de un frame con voz
+VAD_MAX_ZERO_CROSSING_RATE = 0.3  # fracción de muestras con cambio de signo
 
 # Configuración de audio
 AUDIO_SAMPLE_RATE = 16000  # Hz
@@ -120,9 +246,18 @@ MAX_REPETITION_RATIO = 0.7
 
 
 # Configuración de archivos temporales
+@lru_cache(maxsize=1)
 def get_temp_dir() -> str:
-    """Genera un directorio temporal único para cada ejecución."""
+    """Genera un directorio temporal único para cada ejecución (se crea una sola vez por proceso)."""
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     temp_base = os.path.join(tempfile.gettempdir(), "whisper-lang-detector", timestamp)
     os.makedirs(temp_base, exist_ok=True)
     return temp_base
+
+
+@lru_cache(maxsize=1)
+def get_probe_cache_dir() -> str:
+    """Directorio persistente (compartido entre ejecuciones) para la caché de ffprobe."""
+    cache_dir = os.path.join(tempfile.gettempdir(), "whisper-lang-detector", "probe_cache")
+    os.makedirs(cache_dir, exist_ok=True)
+    return cache_dir
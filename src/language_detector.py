@@ -2,27 +2,183 @@
 Funciones para detección de idioma y transcripción con Whisper.
 """
 
+import heapq
+import importlib.util
+import itertools
 import os
-from typing import Optional, Tuple
+import platform
+import threading
+from functools import lru_cache
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .config import (
+    AUDIO_SAMPLE_RATE,
+    FASTER_WHISPER_ONLY_MODELS,
+    LANGUAGE_EARLY_EXIT_CONFIDENCE,
+    LANGUAGE_EARLY_EXIT_MAX_RUNNER_UP,
+    MIN_AUDIO_FILE_SIZE,
+    WHISPER_BACKEND,
+    WHISPER_COMPILE_ENCODER,
+    WHISPER_COMPILE_MEL,
+    WHISPER_CPU_INT8_QUANTIZATION,
+    WHISPER_WARMUP,
+)
+
+# whisper, torch y faster-whisper se importan de forma diferida dentro de las funciones que los usan:
+# importarlos cuesta cientos de milisegundos, que así no se pagan en --help ni en errores de argumentos
+if TYPE_CHECKING:
+    import torch
+    from whisper.model import Whisper
+
+# faster-whisper es un extra opcional ([faster])
+FASTER_WHISPER_AVAILABLE = importlib.util.find_spec("faster_whisper") is not None
+
+
+class FasterWhisperBackend:
+    """Envoltorio mínimo sobre un modelo de faster-whisper (CTranslate2) con cuantización INT8."""
+
+    def __init__(self, model_name: str, download_root: Optional[str] = None):
+        """
+        Carga el modelo con faster-whisper.
+
+        Args:
+            model_name: Nombre del modelo (tiny, base, small, medium, large)
+            download_root: Directorio donde descargar/buscar el modelo
+        """
+        import ctranslate2
+        import faster_whisper
+
+        self.device = "cuda" if ctranslate2.get_cuda_device_count() > 0 else "cpu"
+        compute_type = "int8_float16" if self.device == "cuda" else "int8"
+        self.model = faster_whisper.WhisperModel(
+            model_name, device=self.device, compute_type=compute_type, download_root=download_root, cpu_threads=os.cpu_count() or 0
+        )
+
+    def detect_language_batch(self, chunks: Sequence[np.ndarray]) -> List[Dict[str, float]]:
+        """Devuelve las probabilidades de idioma de cada chunk de 30s, con un único encode para todo el lote."""
+        from faster_whisper.audio import pad_or_trim
+
+        # Mismo proceso que WhisperModel.detect_language, pero con todos los chunks en el mismo lote
+        features = np.stack([pad_or_trim(self.model.feature_extractor(chunk)) for chunk in chunks])
+        encoder_output = self.model.encode(features)
+        # Cada resultado es una lista de (token "<|xx|>", probabilidad) de todos los idiomas
+        return [{token[2:-2]: probability for token, probability in result} for result in self.model.model.detect_language(encoder_output)]
+
+    def transcribe(self, audio: np.ndarray, **options) -> str:
+        """Transcribe el audio y devuelve el texto completo."""
+        segments, _ = self.model.transcribe(audio, **options)
+        return "".join(segment.text for segment in segments)
+
+
+LoadedWhisperModel = Union["Whisper", FasterWhisperBackend]
+
+# Serializa la carga de modelos: los modelos cargados se reutilizan durante todo el proceso
+_MODEL_LOAD_LOCK = threading.Lock()
+
+
+def _replace_whisper_linears(module: "torch.nn.Module") -> None:
+    """Sustituye las capas whisper.model.Linear por nn.Linear que comparten los mismos pesos."""
+    import torch
+    from whisper.model import Linear as WhisperLinear
+
+    for name, child in module.named_children():
+        if type(child) is WhisperLinear:
+            linear = torch.nn.Linear(child.in_features, child.out_features, bias=child.bias is not None, device="meta")
+            linear.weight = child.weight
+            linear.bias = child.bias
+            setattr(module, name, linear)
+        else:
+            _replace_whisper_linears(child)
+
+
+def quantize_model_for_cpu(model: "Whisper") -> "Whisper":
+    """
+    Cuantiza dinámicamente a INT8 las capas lineales de un modelo openai-whisper para inferencia en CPU.
 
-import whisper
-from whisper.model import Whisper
+    quantize_dynamic solo reconoce nn.Linear exacto, así que antes se cambian las subclases Linear de Whisper.
 
-from .config import MIN_AUDIO_FILE_SIZE
+    Args:
+        model: Modelo de Whisper cargado en CPU
 
+    Returns:
+        Modelo cuantizado
+    """
+    import torch
 
-def load_whisper_model(model_name: str = "base", download_root: Optional[str] = None):
+    engine = "qnnpack" if platform.machine().lower() in ("arm64", "aarch64") else "fbgemm"
+    if engine not in torch.backends.quantized.supported_engines:
+        print(f"  ⚠️  Motor de cuantización '{engine}' no disponible, se usa el modelo FP32")
+        return model
+
+    torch.backends.quantized.engine = engine
+    _replace_whisper_linears(model)
+    return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+
+
+def convert_model_to_fp16(model: "Whisper") -> None:
+    """
+    Pasa a FP16 los pesos de las capas lineales, convolucionales y de embedding de un modelo openai-whisper en GPU.
+
+    Whisper convierte los pesos al dtype de la entrada en cada forward, así que con pesos FP32 y
+    entradas FP16 se copiaban todos los pesos en cada llamada. Las LayerNorm se quedan en FP32:
+    Whisper las calcula siempre en FP32.
+
+    Args:
+        model: Modelo de Whisper cargado en CUDA
+    """
+    import torch
+
+    for module in model.modules():
+        if isinstance(module, (torch.nn.Linear, torch.nn.Conv1d, torch.nn.Embedding)):
+            module.half()
+
+
+def compile_encoder_for_gpu(model: "Whisper") -> bool:
+    """
+    Compila con torch.compile el encoder de un modelo openai-whisper cargado en GPU.
+
+    Las entradas del encoder siempre son mels de 30s (n_mels, 3000), así que solo cambia el tamaño
+    del lote; se deja que torch.compile lo trate como dimensión dinámica tras la primera recompilación.
+    La compilación se prueba en el momento con un lote vacío: si falla, se conserva el encoder original.
+
+    Args:
+        model: Modelo de Whisper cargado en CUDA
+
+    Returns:
+        True si el encoder quedó compilado
+    """
+    import torch
+    from whisper.audio import N_FRAMES
+
+    encoder = model.encoder
+    model.encoder = torch.compile(encoder)
+    try:
+        with torch.inference_mode():
+            model.encoder(torch.zeros(1, model.dims.n_mels, N_FRAMES, device=model.device, dtype=torch.float16))
+    except Exception as e:
+        print(f"  ⚠️  No se pudo compilar el encoder, se usa la versión sin compilar: {e}")
+        model.encoder = encoder
+        return False
+    return True
+
+
+def load_whisper_model(model_name: str = "base", download_root: Optional[str] = None, backend: str = WHISPER_BACKEND) -> LoadedWhisperModel:
     """
     Carga un modelo de Whisper.
 
     Args:
-        model_name: Nombre del modelo (tiny, base, small, medium, large)
+        model_name: Nombre del modelo (ver WHISPER_MODELS)
         download_root: Directorio donde descargar/buscar el modelo.
                       Si no se especifica, usa la variable de entorno WHISPER_MODEL_DIR
                       o el directorio por defecto ~/.cache/whisper/
+        backend: "faster-whisper", "openai-whisper" o "auto" (ver WHISPER_BACKEND)
 
     Returns:
-        Modelo de Whisper cargado
+        Modelo de Whisper cargado (FasterWhisperBackend si se usa faster-whisper).
+        El modelo se reutiliza en llamadas posteriores con los mismos parámetros.
 
     Nota:
         Los modelos se descargan desde https://openaipublic.azureedge.net/main/whisper/
@@ -31,22 +187,72 @@ def load_whisper_model(model_name: str = "base", download_root: Optional[str] =
     # Usar directorio personalizado si está configurado
     if download_root is None:
         download_root = os.environ.get("WHISPER_MODEL_DIR")
+    if download_root:
+        download_root = os.path.abspath(download_root)
+
+    if backend == "auto":
+        backend = "faster-whisper" if FASTER_WHISPER_AVAILABLE else "openai-whisper"
+    if model_name in FASTER_WHISPER_ONLY_MODELS and backend != "faster-whisper":
+        raise ValueError(f"El modelo '{model_name}' solo está disponible con faster-whisper; instálalo con: pip install 'whisper-lang-detector[faster]'")
+    if backend == "faster-whisper" and not FASTER_WHISPER_AVAILABLE:
+        raise ImportError("faster-whisper no está instalado; instálalo con: pip install 'whisper-lang-detector[faster]'")
+
+    # Con los argumentos ya normalizados, las llamadas equivalentes comparten el mismo modelo
+    # (el lock evita que dos hilos carguen a la vez el mismo modelo, lru_cache no lo impide)
+    with _MODEL_LOAD_LOCK:
+        return _load_whisper_model_cached(model_name, download_root, backend)
+
+
+def warmup_whisper_model(whisper_model: LoadedWhisperModel) -> None:
+    """
+    Ejecuta una detección de idioma sobre 30s de silencio para que la primera muestra real no pague
+    la inicialización del dispositivo (contexto CUDA, autotuning de cuDNN, compilación del mel).
+
+    Args:
+        whisper_model: Modelo de Whisper ya cargado
+    """
+    silence = np.zeros(30 * AUDIO_SAMPLE_RATE, dtype=np.float32)
+    try:
+        _detect_language_batch([silence], whisper_model)
+    except Exception as e:
+        # El calentamiento es solo una optimización: si falla, el error real aparecerá al detectar
+        print(f"  ⚠️  No se pudo calentar el modelo: {e}")
+
 
+@lru_cache(maxsize=2)
+def _load_whisper_model_cached(model_name: str, download_root: Optional[str], backend: str) -> LoadedWhisperModel:
+    """Carga el modelo una sola vez por proceso para cada (modelo, directorio, backend)."""
     print(f"  🤖 Cargando modelo Whisper '{model_name}'...")
     if download_root:
         print(f"     📁 Directorio de modelos: {download_root}")
         os.makedirs(download_root, exist_ok=True)
 
     try:
-        model = whisper.load_model(model_name, download_root=download_root)
-        print(f"  ✅ Modelo '{model_name}' cargado correctamente")
-        return model
+        if backend == "faster-whisper":
+            model = FasterWhisperBackend(model_name, download_root=download_root)
+        else:
+            import whisper
+
+            model = whisper.load_model(model_name, download_root=download_root)
+            if WHISPER_CPU_INT8_QUANTIZATION and model.device.type == "cpu":
+                model = quantize_model_for_cpu(model)
+                print("     ⚡ Capas lineales cuantizadas a INT8 para CPU")
+            elif model.device.type == "cuda":
+                convert_model_to_fp16(model)
+                print("     ⚡ Pesos convertidos a FP16 para GPU")
+                if WHISPER_COMPILE_ENCODER and compile_encoder_for_gpu(model):
+                    print("     ⚡ Encoder compilado con torch.compile")
+        print(f"  ✅ Modelo '{model_name}' cargado correctamente ({backend})")
     except Exception as e:
         print(f"  ❌ Error al cargar el modelo '{model_name}': {e}")
         print("     💡 Tip: Intenta predescargar el modelo con:")
         print(f"        python -c \"import whisper; whisper.load_model('{model_name}')\"")
         raise
 
+    if WHISPER_WARMUP:
+        warmup_whisper_model(model)
+    return model
+
 
 def is_transcription_repetitive(text: str, max_repetition_ratio: float = 0.3) -> bool:
     """
@@ -69,59 +275,143 @@ def is_transcription_repetitive(text: str, max_repetition_ratio: float = 0.3) ->
     if len(words) < 5:
         return False
 
+    num_words = len(words)
+    # Posición de inicio de cada palabra en el texto unido por espacios, para medir n-gramas sin construir strings
+    char_offsets = list(itertools.accumulate((len(word) + 1 for word in words), initial=0))
+
     # Detectar frases o palabras que se repiten consecutivamente
     # Buscar secuencias de 2-10 palabras que se repiten
-    for seq_len in range(2, min(11, len(words) // 2 + 1)):
-        for i in range(len(words) - seq_len * 2):
-            sequence = " ".join(words[i : i + seq_len])
-            remaining_text = " ".join(words[i:])
-
-            # Contar cuántas veces se repite la secuencia consecutivamente
-            count = 0
-            pos = 0
-            while pos < len(remaining_text):
-                if remaining_text[pos : pos + len(sequence)] == sequence:
-                    count += 1
-                    pos += len(sequence) + 1  # +1 para el espacio
-                else:
-                    break
+    for seq_len in range(2, min(11, num_words // 2 + 1)):
+        ngrams = _ngrams(words, seq_len)
+
+        # runs[i]: veces seguidas que aparece ngrams[i] a partir de la posición i (recorrido hacia atrás)
+        runs = [1] * len(ngrams)
+        for i in range(len(ngrams) - seq_len - 1, -1, -1):
+            if ngrams[i] == ngrams[i + seq_len]:
+                runs[i] = runs[i + seq_len] + 1
 
+        for i in range(num_words - seq_len * 2):
+            count = runs[i]
             # Si una secuencia se repite 3+ veces seguidas, es sospechoso
             if count >= 3:
-                repetition_ratio = (count * len(sequence)) / len(normalized)
+                sequence_length = char_offsets[i + seq_len] - char_offsets[i] - 1
+                repetition_ratio = (count * sequence_length) / len(normalized)
                 if repetition_ratio > max_repetition_ratio:
+                    sequence = " ".join(ngrams[i])
                     print(f"  ⚠️ Repetición detectada: '{sequence[:50]}...' se repite {count} veces ({repetition_ratio:.1%})")
                     return True
 
     # Detectar si una frase corta domina más del 40% del texto
-    for seq_len in range(3, min(8, len(words) // 3 + 1)):
-        for i in range(len(words) - seq_len):
-            sequence = " ".join(words[i : i + seq_len])
-            count = normalized.count(sequence)
-            if count > 1:
-                repetition_ratio = (count * len(sequence)) / len(normalized)
-                if repetition_ratio > 0.4:
-                    print(f"  ⚠️ Frase dominante: '{sequence[:50]}...' aparece {count} veces ({repetition_ratio:.1%})")
-                    return True
+    dominant_phrase = _find_dominant_phrase(words, len(normalized))
+    if dominant_phrase:
+        sequence, count, repetition_ratio = dominant_phrase
+        print(f"  ⚠️ Frase dominante: '{sequence[:50]}...' aparece {count} veces ({repetition_ratio:.1%})")
+        return True
 
     return False
 
 
-def detect_language_with_loaded_model(audio_path: str, whisper_model: Whisper) -> Tuple[str, float]:
+def _find_dominant_phrase(words: List[str], text_length: int, max_ratio: float = 0.4) -> Optional[Tuple[str, int, float]]:
     """
-    Detecta el idioma usando un modelo Whisper ya cargado.
-    Analiza múltiples segmentos del audio para mejor precisión.
+    Busca una frase de 3-7 palabras que ocupe más de max_ratio del texto.
 
     Args:
-        audio_path: Ruta al archivo de audio
-        whisper_model: Modelo de Whisper ya cargado
+        words: Palabras del texto normalizado
+        text_length: Longitud en caracteres del texto normalizado
+        max_ratio: Fracción máxima del texto que puede ocupar una frase repetida
 
     Returns:
-        Tupla (detected_lang, confidence)
+        Tupla (frase, apariciones, ratio) de la primera frase dominante, o None si no hay ninguna
     """
-    print("  🔍 Detectando idioma (modelo ya cargado)...")
-    audio = whisper.load_audio(audio_path)
+    for seq_len in range(3, min(8, len(words) // 3 + 1)):
+        for ngram, count in _count_ngrams(words, seq_len).items():
+            if count > 1:
+                sequence_length = sum(map(len, ngram)) + seq_len - 1
+                repetition_ratio = (count * sequence_length) / text_length
+                if repetition_ratio > max_ratio:
+                    return " ".join(ngram), count, repetition_ratio
+    return None
+
+
+def _ngrams(words: List[str], n: int) -> List[Tuple[str, ...]]:
+    """Devuelve los n-gramas de palabras (solapados) en orden de aparición."""
+    return list(zip(*(words[offset:] for offset in range(n))))
+
+
+def _count_ngrams(words: List[str], n: int) -> Dict[Tuple[str, ...], int]:
+    """Cuenta las apariciones no solapadas de cada n-grama (como str.count), en orden de primera aparición."""
+    counts: Dict[Tuple[str, ...], int] = {}
+    next_start: Dict[Tuple[str, ...], int] = {}
+    for i, ngram in enumerate(_ngrams(words, n)):
+        if i >= next_start.get(ngram, 0):
+            counts[ngram] = counts.get(ngram, 0) + 1
+            next_start[ngram] = i + n
+    return counts
+
+
+# Serializa el uso de los modelos cuando se analizan varias pistas en paralelo (o varios VideoProcessor comparten
+# modelo desde distintos hilos): la decodificación de openai-whisper instala hooks de kv-cache en el propio modelo,
+# así que no admite llamadas concurrentes
+_MODEL_LOCK = threading.Lock()
+
+# log_mel_spectrogram compilado con torch.compile (solo en CUDA); se crea la primera vez que se usa
+_compiled_log_mel_spectrogram = None
+
+
+def _log_mel_spectrogram(chunk: np.ndarray, n_mels: int, device: "torch.device") -> "torch.Tensor":
+    """
+    Calcula el log-mel de un chunk de 30s directamente en el dispositivo del modelo.
+
+    En CUDA se usa una versión compilada con torch.compile: todos los chunks tienen la misma
+    forma, así que se compila una única vez. Se usa el modo por defecto (kernels fusionados, sin
+    CUDA graphs): los CUDA graphs guardan estado por hilo y reutilizan los buffers de salida.
+    """
+    global _compiled_log_mel_spectrogram
+    import torch
+    import whisper
 
+    audio = torch.from_numpy(chunk).to(device)
+    if device.type != "cuda" or not WHISPER_COMPILE_MEL:
+        return whisper.log_mel_spectrogram(audio, n_mels)
+
+    if _compiled_log_mel_spectrogram is None:
+        _compiled_log_mel_spectrogram = torch.compile(whisper.log_mel_spectrogram, dynamic=False)
+    try:
+        return _compiled_log_mel_spectrogram(audio, n_mels)
+    except Exception as e:
+        print(f"  ⚠️  No se pudo compilar el espectrograma mel, se usa la versión sin compilar: {e}")
+        _compiled_log_mel_spectrogram = whisper.log_mel_spectrogram
+        return whisper.log_mel_spectrogram(audio, n_mels)
+
+
+def _detect_language_batch(chunks: Sequence[np.ndarray], whisper_model: LoadedWhisperModel) -> List[Dict[str, float]]:
+    """Devuelve las probabilidades de idioma de cada chunk de 30s, con un único forward para todo el lote."""
+    if isinstance(whisper_model, FasterWhisperBackend):
+        with _MODEL_LOCK:
+            return whisper_model.detect_language_batch(chunks)
+
+    import torch
+
+    # Mel de cada chunk por separado: log_mel_spectrogram normaliza con el máximo de toda su entrada,
+    # así que calcularlo sobre el lote mezclaría los chunks
+    with _MODEL_LOCK, torch.inference_mode():
+        mels = torch.stack([_log_mel_spectrogram(chunk, whisper_model.dims.n_mels, whisper_model.device) for chunk in chunks])
+        if whisper_model.device.type == "cuda":
+            # En GPU el encoder trabaja en FP16 (las capas de Whisper adaptan sus pesos al dtype de la entrada)
+            mels = mels.half()
+        _, probs_list = whisper_model.detect_language(mels)
+    return probs_list
+
+
+def _load_audio_file(audio_path: str) -> np.ndarray:
+    """Decodifica un archivo de audio a float32 mono a 16 kHz, el formato de entrada de Whisper."""
+    import whisper
+
+    return whisper.load_audio(audio_path)
+
+
+def _split_detection_chunks(audio: np.ndarray) -> np.ndarray:
+    """Divide el audio en los chunks de 30s que se usan para detectar el idioma (como máximo 3)."""
     # Whisper analiza en chunks de 30s para detección de idioma
     # Vamos a analizar múltiples segmentos para mejor precisión
     chunk_size = 30 * 16000  # 30 segundos en samples (16kHz)
@@ -130,23 +420,23 @@ def detect_language_with_loaded_model(audio_path: str, whisper_model: Whisper) -
     # Limitar a los primeros 3 chunks para no hacerlo demasiado lento
     num_chunks = min(num_chunks, 3)
 
-    language_votes = {}  # {idioma: [confianzas]}
-
-    print(f"  🔍 Analizando {num_chunks} segmento(s) de audio...")
+    # Chunks de exactamente 30s como vista (num_chunks, chunk_size) sobre el audio; solo se copia
+    # si hay que rellenar con ceros un audio más corto que los chunks a analizar
+    analyzed_samples = num_chunks * chunk_size
+    if len(audio) < analyzed_samples:
+        audio = np.pad(audio, (0, analyzed_samples - len(audio)))
+    return audio[:analyzed_samples].reshape(num_chunks, chunk_size)
 
-    for i in range(num_chunks):
-        start = i * chunk_size
-        end = min(start + chunk_size, len(audio))
-        chunk = audio[start:end]
 
-        # Pad o trim el chunk a exactamente 30s
-        chunk = whisper.pad_or_trim(chunk)
-
-        mel = whisper.log_mel_spectrogram(chunk).to(whisper_model.device)
-        _, probs = whisper_model.detect_language(mel)
+def _vote_language(probs_list: List[Dict[str, float]]) -> Tuple[str, float]:
+    """Combina las probabilidades de los chunks de un audio en un único idioma y su confianza."""
+    language_votes = {}  # {idioma: [confianzas]}
 
-        detected_lang = max(probs, key=probs.get)
-        confidence = probs[detected_lang]
+    for i, probs in enumerate(probs_list):
+        # max() e index() sobre la lista de probabilidades recorren en C, sin un probs.get por idioma
+        values = list(probs.values())
+        confidence = max(values)
+        detected_lang = list(probs)[values.index(confidence)]
 
         if detected_lang not in language_votes:
             language_votes[detected_lang] = []
@@ -175,53 +465,146 @@ def detect_language_with_loaded_model(audio_path: str, whisper_model: Whisper) -
     return best_lang, final_confidence
 
 
-def transcribe_with_loaded_model(audio_path: str, whisper_model: Whisper, language: Optional[str] = None) -> str:
+def detect_language_batch(
+    audios: Sequence[Union[str, np.ndarray]], whisper_model: LoadedWhisperModel, early_exit_confidence: float = LANGUAGE_EARLY_EXIT_CONFIDENCE
+) -> List[Tuple[str, float]]:
+    """
+    Detecta el idioma de varios audios a la vez usando un modelo Whisper ya cargado.
+
+    Los chunks de todos los audios se agrupan en lotes: primero el chunk inicial de cada audio en un
+    único forward, y después, en otro, los chunks restantes de los audios cuyo primer chunk no fue concluyente.
+
+    Args:
+        audios: Audios ya decodificados (float32 mono a 16 kHz), o rutas a los archivos de audio
+        whisper_model: Modelo de Whisper ya cargado
+        early_exit_confidence: Confianza del primer segmento a partir de la cual no se analizan los demás
+
+    Returns:
+        Lista de tuplas (detected_lang, confidence), una por audio y en el mismo orden
+    """
+    audios = [_load_audio_file(audio) if isinstance(audio, str) else audio for audio in audios]
+    if not audios:
+        return []
+
+    audio_chunks = [_split_detection_chunks(audio) for audio in audios]
+
+    # Primero el segmento inicial de cada audio; los restantes solo de los audios no concluyentes
+    first_probs = _detect_language_batch([chunks[0] for chunks in audio_chunks], whisper_model)
+    probs_per_audio = [[probs] for probs in first_probs]
+    pending_chunks = []  # (índice del audio, chunk)
+    for index, (chunks, probs) in enumerate(zip(audio_chunks, first_probs)):
+        if len(chunks) == 1:
+            continue
+        top_confidence, runner_up_confidence = heapq.nlargest(2, probs.values())
+        if top_confidence > early_exit_confidence and runner_up_confidence < LANGUAGE_EARLY_EXIT_MAX_RUNNER_UP:
+            continue
+        pending_chunks.extend((index, chunk) for chunk in chunks[1:])
+
+    if pending_chunks:
+        pending_probs = _detect_language_batch([chunk for _, chunk in pending_chunks], whisper_model)
+        for (index, _), probs in zip(pending_chunks, pending_probs):
+            probs_per_audio[index].append(probs)
+
+    results = []
+    for chunks, probs_list in zip(audio_chunks, probs_per_audio):
+        print(f"  🔍 Analizados {len(probs_list)} de {len(chunks)} segmento(s) de audio...")
+        if len(probs_list) < len(chunks):
+            print(f"  ⏩ Primer segmento concluyente, se omiten los {len(chunks) - 1} restantes")
+        results.append(_vote_language(probs_list))
+    return results
+
+
+def detect_language_with_loaded_model(
+    audio: Union[str, np.ndarray], whisper_model: LoadedWhisperModel, early_exit_confidence: float = LANGUAGE_EARLY_EXIT_CONFIDENCE
+) -> Tuple[str, float]:
+    """
+    Detecta el idioma usando un modelo Whisper ya cargado.
+    Analiza múltiples segmentos del audio para mejor precisión, salvo que el primero ya sea concluyente.
+
+    Args:
+        audio: Audio ya decodificado (float32 mono a 16 kHz), o ruta al archivo de audio
+        whisper_model: Modelo de Whisper ya cargado
+        early_exit_confidence: Confianza del primer segmento a partir de la cual no se analizan los demás
+
+    Returns:
+        Tupla (detected_lang, confidence)
+    """
+    print("  🔍 Detectando idioma (modelo ya cargado)...")
+    return detect_language_batch([audio], whisper_model, early_exit_confidence)[0]
+
+
+# Opciones de transcripción comunes a todas las llamadas (el idioma y fp16 se añaden en cada una)
+_TRANSCRIBE_OPTIONS = MappingProxyType(
+    {
+        "temperature": (0.0, 0.2, 0.4),  # Usar temperatura 0 para más estabilidad
+        "condition_on_previous_text": False,  # Evita sesgos de contexto anterior
+        "no_speech_threshold": 0.8,  # Umbral para detectar segmentos sin habla
+        # Parámetros anti-alucinación críticos:
+        "patience": 1,  # opcional: ligeramente más exploración
+        "beam_size": 5,  # beam search estable
+        "compression_ratio_threshold": 1.8,  # Detecta repeticiones (más estricto que default 2.4)
+        "logprob_threshold": -0.2,  # Rechaza transcripciones de baja confianza (más estricto que -1.0)
+    }
+)
+# Las mismas opciones para faster-whisper, donde el umbral de logprob cambia de nombre
+# (y la precisión la fija compute_type, así que no lleva fp16)
+_FASTER_WHISPER_TRANSCRIBE_OPTIONS = MappingProxyType(
+    {("log_prob_threshold" if name == "logprob_threshold" else name): value for name, value in _TRANSCRIBE_OPTIONS.items()}
+)
+
+
+def transcribe_with_loaded_model(
+    audio: Union[str, np.ndarray], whisper_model: LoadedWhisperModel, language: Optional[str] = None, need_transcription: bool = True
+) -> str:
     """
     Transcribe audio using a pre-loaded Whisper model.
 
+    Accepts either the audio already decoded (float32 mono at 16 kHz) or a path to the audio file.
     Returns the transcription text (may be empty on error or hallucination).
+    If need_transcription is False, returns "" right away without running the decoder.
     """
+    if not need_transcription:
+        return ""
+
     try:
         print("  📝 [DEBUG] Transcribiendo audio...")
 
-        # Validar que el archivo existe y tiene contenido
-        if not os.path.exists(audio_path):
-            print("  ⚠️ [DEBUG] Archivo de audio no existe para transcribir")
-            return ""
+        if isinstance(audio, str):
+            # Validar que el archivo existe y tiene contenido (un único stat)
+            try:
+                file_size = os.stat(audio).st_size
+            except FileNotFoundError:
+                print("  ⚠️ [DEBUG] Archivo de audio no existe para transcribir")
+                return ""
 
-        file_size = os.path.getsize(audio_path)
-        if file_size < MIN_AUDIO_FILE_SIZE:
-            print(f"  ⚠️ [DEBUG] Archivo muy pequeño ({file_size} bytes), omitiendo transcripción")
-            return ""
+            if file_size < MIN_AUDIO_FILE_SIZE:
+                print(f"  ⚠️ [DEBUG] Archivo muy pequeño ({file_size} bytes), omitiendo transcripción")
+                return ""
 
-        # Cargar y validar el audio
-        try:
-            audio = whisper.load_audio(audio_path)
-            if len(audio) == 0:
-                print("  ⚠️ [DEBUG] Audio vacío, omitiendo transcripción")
+            # Cargar el audio
+            try:
+                audio = _load_audio_file(audio)
+            except Exception as e:
+                print(f"  ⚠️ [DEBUG] Error al cargar audio: {e}")
                 return ""
-        except Exception as e:
-            print(f"  ⚠️ [DEBUG] Error al cargar audio: {e}")
+
+        if len(audio) == 0:
+            print("  ⚠️ [DEBUG] Audio vacío, omitiendo transcripción")
             return ""
 
-        options = {
-            "language": language if language else None,
-            "fp16": False,  # Desactivar fp16 para evitar problemas con NaN
-            "temperature": (0.0, 0.2, 0.4),  # Usar temperatura 0 para más estabilidad
-            "condition_on_previous_text": False,  # Evita sesgos de contexto anterior
-            "no_speech_threshold": 0.8,  # Umbral para detectar segmentos sin habla
-            # Parámetros anti-alucinación críticos:
-            "patience": 1,  # opcional: ligeramente más exploración
-            "beam_size": 5,  # beam search estable
-            "compression_ratio_threshold": 1.8,  # Detecta repeticiones (más estricto que default 2.4)
-            "logprob_threshold": -0.2,  # Rechaza transcripciones de baja confianza (más estricto que -1.0)
-        }
-        # Eliminar opciones None
-        options = {k: v for k, v in options.items() if v is not None}
-
-        # whisper's transcribe method accepts a file path and returns a dict with 'text'
-        result = whisper_model.transcribe(audio_path, **options)
-        text = result.get("text", "").strip() if isinstance(result, dict) else ""
+        # Las opciones fijas se pasan directamente desde la plantilla, sin construir un dict por llamada
+        if isinstance(whisper_model, FasterWhisperBackend):
+            with _MODEL_LOCK:
+                text = whisper_model.transcribe(audio, language=language or None, **_FASTER_WHISPER_TRANSCRIBE_OPTIONS).strip()
+        else:
+            import torch
+
+            # FP16 solo en GPU; los segmentos con NaN los descarta logprob_threshold
+            fp16 = whisper_model.device.type == "cuda"
+            # whisper's transcribe method accepts the decoded audio and returns a dict with 'text'
+            with _MODEL_LOCK, torch.inference_mode():
+                result = whisper_model.transcribe(audio, language=language or None, fp16=fp16, **_TRANSCRIBE_OPTIONS)
+            text = result.get("text", "").strip() if isinstance(result, dict) else ""
 
         # Validar que la transcripción no sea una alucinación
         if text and is_transcription_repetitive(text):
@@ -9,10 +9,27 @@ import json
 import sys
 from typing import Any, Dict
 
-from src.config import NO_LANGUAGE_CODES
+from src.config import NO_LANGUAGE_CODES, WHISPER_MODELS
 
 from .video_processor import VideoProcessor
 
+try:
+    import orjson
+except ImportError:  # Dependencia opcional (extra [json]); se usa el json de la biblioteca estándar
+    orjson = None
+
+
+def print_json(data: Dict[str, Any]) -> None:
+    """Escribe data como JSON indentado en stdout, con orjson si está disponible."""
+    if orjson is None:
+        print(json.dumps(data, indent=2, ensure_ascii=False))
+        return
+
+    # orjson genera directamente UTF-8: se escribe en el buffer binario tras vaciar lo pendiente en modo texto
+    sys.stdout.flush()
+    sys.stdout.buffer.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_APPEND_NEWLINE))
+    sys.stdout.buffer.flush()
+
 
 def print_summary(result: Dict[str, Any]) -> None:
     """Muestra un resumen legible de los resultados."""
@@ -104,7 +121,12 @@ def print_summary(result: Dict[str, Any]) -> None:
 def main() -> None:
     parser = argparse.ArgumentParser(description="Detecta idiomas de pistas de audio usando Whisper y devuelve información en JSON")
     parser.add_argument("video_path", help="Ruta al archivo de video")
-    parser.add_argument("--model", default="base", choices=["tiny", "base", "small", "medium", "large"], help="Modelo de Whisper a usar (default: base)")
+    parser.add_argument("--model", default="base", choices=WHISPER_MODELS, help="Modelo de Whisper a usar (default: base)")
+    parser.add_argument(
+        "--lang-detect-model",
+        choices=WHISPER_MODELS,
+        help="Modelo de Whisper para la detección de idioma, p. ej. tiny (default: el de --model; --model se usa entonces solo para transcribir)",
+    )
     parser.add_argument("--json", action="store_true", help="Devolver salida solo en formato JSON (sin logs)")
     parser.add_argument("--debug", action="store_true", help="Modo debug: no borra archivos temporales y muestra sus rutas")
     parser.add_argument("--summary", action="store_true", help="Mostrar resumen del procesamiento")
@@ -118,7 +140,7 @@ def main() -> None:
     # Redirigir stdout a stderr temporalmente para los logs
     sys.stdout = sys.stderr
 
-    processor = VideoProcessor(video_path=args.video_path, model=args.model, debug=args.debug)
+    processor = VideoProcessor(video_path=args.video_path, model=args.model, debug=args.debug, lang_detect_model=args.lang_detect_model)
     result = processor.process_video()
 
     # Mostrar resultado en formato legible
@@ -131,9 +153,9 @@ def main() -> None:
     if args.json:
         sys.stdout = original_stdout
         if result:
-            print(json.dumps(result, indent=2, ensure_ascii=False))
+            print_json(result)
         else:
-            print(json.dumps({"error": "Failed to process video"}, indent=2))
+            print_json({"error": "Failed to process video"})
 
     sys.exit(0 if result else 1)
 
@@ -2,10 +2,15 @@
 Clase para analizar pistas de audio individuales.
 """
 
-import os
+import math
+from collections import Counter, defaultdict
 from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
 
+import numpy as np
+
 from .config import (
+    EARLY_STOP_ASSIGNED_MATCHES,
+    EARLY_STOP_UNASSIGNED_MATCHES,
     EXTENDED_DURATION_PERCENT,
     EXTENDED_MAX_DURATION,
     EXTENDED_START_PERCENT,
@@ -17,6 +22,7 @@ from .config import (
     WHISPER_TO_ISO639_2,
 )
 from .language_detector import (
+    detect_language_batch,
     detect_language_with_loaded_model,
     transcribe_with_loaded_model,
 )
@@ -42,6 +48,8 @@ class TrackAnalyzer:
         self.audio_tools = video_processor.audio_tools
         self.video_duration = video_processor.video_duration
         self.whisper_model = video_processor.whisper_model
+        self.transcription_model = video_processor.transcription_model
+        self.need_transcription = video_processor.need_transcription
 
         # Estadísticas del análisis
         self.valid_samples_count: int = 0  # Número de muestras válidas obtenidas
@@ -49,12 +57,16 @@ class TrackAnalyzer:
         self.extended_analysis_performed: bool = False  # Si se realizó análisis extendido
         self.analysis_method: str = ""  # Método usado: "sampling", "extended", "hybrid"
 
-    def __perform_extended_analysis(self) -> Tuple[Optional[str], float, str]:
+        # Audio con voz ya calculado por ventana (inicio, duración): en videos cortos o con posiciones que
+        # se ajustan al final, varios muestreos caen en la misma ventana y el VAD se aplica una sola vez
+        self._vad_cache: Dict[Tuple[int, int], Optional[np.ndarray]] = {}
+
+    def __perform_extended_analysis(self) -> Tuple[Optional[str], float, Optional[np.ndarray]]:
         """
         Realiza un análisis extendido del audio (10% - 90% de la duración).
 
         Returns:
-            Tupla (detected_lang, confidence, transcription) o (None, 0, '') si falla
+            Tupla (detected_lang, confidence, audio con voz) o (None, 0, None) si falla
         """
         print("  🔍 Analizando pista casi completa (10% - 90%)...")
 
@@ -70,44 +82,33 @@ class TrackAnalyzer:
 
         print(f"  📍 Extrayendo desde {extended_start}s por {extended_duration}s")
 
-        extended_sample = self.audio_tools.extract_audio_sample(self.track["id"], extended_duration, extended_start)
+        # En una ventana tan larga, ffmpeg descarta primero los silencios largos para aligerar el VAD
+        extended_sample = self.audio_tools.extract_audio_sample(self.track["id"], extended_duration, extended_start, strip_silence=True)
 
         if not extended_sample:
             print("  ❌ No se pudo extraer audio para análisis extendido")
-            return None, 0, ""
-
-        try:
-            vad_audio, voice_percentage = self.audio_tools.apply_vad(extended_sample)
+            return None, 0, None
 
-            # Rechazar si no hay suficiente voz
-            if not vad_audio:
-                print(f"  ❌ Muestra rechazada por falta de voz ({voice_percentage:.1f}%)")
-                return None, 0, ""
+        audio, voice_percentage = self.audio_tools.apply_vad(extended_sample)
 
-            detected_lang, confidence = detect_language_with_loaded_model(vad_audio, self.whisper_model)
+        # Rechazar si no hay suficiente voz
+        if audio is None:
+            print(f"  ❌ Muestra rechazada por falta de voz ({voice_percentage:.1f}%)")
+            return None, 0, None
 
-            # Marcar que se realizó análisis extendido
-            self.extended_analysis_performed = True
+        detected_lang, confidence = detect_language_with_loaded_model(audio, self.whisper_model)
 
-            # Obtener transcripción solo en modo debug
-            transcription = ""
-            if self.debug:
-                transcription = transcribe_with_loaded_model(vad_audio, self.whisper_model, language=detected_lang)
+        # Marcar que se realizó análisis extendido
+        self.extended_analysis_performed = True
 
-            # Rechazar si la confianza es muy baja
-            if confidence < MIN_CONFIDENCE:
-                print(f"  ⚠️  Confianza muy baja ({confidence:.2%}), rechazando análisis extendido")
-                return None, 0, ""
+        # Rechazar si la confianza es muy baja
+        if confidence < MIN_CONFIDENCE:
+            print(f"  ⚠️  Confianza muy baja ({confidence:.2%}), rechazando análisis extendido")
+            return None, 0, None
 
-            print(f"  ✅ Análisis extendido completado: {detected_lang} (confianza: {confidence:.2%})")
+        print(f"  ✅ Análisis extendido completado: {detected_lang} (confianza: {confidence:.2%})")
 
-            return detected_lang, confidence, transcription
-        finally:
-            if not self.debug:
-                if os.path.exists(extended_sample):
-                    os.remove(extended_sample)
-                if vad_audio and vad_audio != extended_sample and os.path.exists(vad_audio):
-                    os.remove(vad_audio)
+        return detected_lang, confidence, audio if self.need_transcription else None
 
     def analyze(self) -> Dict[str, Any]:
         """
@@ -116,57 +117,71 @@ class TrackAnalyzer:
         Returns:
             Diccionario con información de la pista y detección de idioma
         """
-        print(f"\n--- Procesando pista {self.track['id']} ---")
+        track = self.track
+        original_language = track["language"]
+        print(f"\n--- Procesando pista {track['id']} ---")
 
         track_result = {
-            "id": self.track["id"],
-            "stream_order": self.track["stream_order"],
-            "codec": self.track["codec"],
-            "channels": self.track["channels"],
-            "title": self.track.get("title"),
-            "original_language": self.track["language"],
+            "id": track["id"],
+            "stream_order": track["stream_order"],
+            "codec": track["codec"],
+            "channels": track["channels"],
+            "title": track.get("title"),
+            "original_language": original_language,
             "original_language_iso": None,
             "detected_language": None,
             "detected_language_iso": None,
             "confidence": None,
             "needs_review": False,
             "transcription": None,
-            "should_ignore": self.track.get("should_ignore", False),
+            "should_ignore": track.get("should_ignore", False),
         }
 
         # Verificar si la pista debe ser ignorada
-        if track_result.get("should_ignore"):
-            print(f"  🚫 Pista marcada para ignorar debido a su título: '{self.track.get('title', 'Sin título')}'")
-            track_result["ignore_reason"] = f"Título contiene palabras clave para ignorar: '{self.track.get('title', 'Sin título')}'"
+        if track_result["should_ignore"]:
+            title = track.get("title", "Sin título")
+            print(f"  🚫 Pista marcada para ignorar debido a su título: '{title}'")
+            track_result["ignore_reason"] = f"Título contiene palabras clave para ignorar: '{title}'"
             return track_result
 
-        # Convertir idioma original a ISO 639-2 si existe
-        original_language_iso = None
-        if self.track["language"] and self.track["language"] != "und":
-            original_language_iso = WHISPER_TO_ISO639_2.get(self.track["language"], self.track["language"])
-
-        track_result["original_language_iso"] = original_language_iso
-
-        # Verificar si ya tiene idioma asignado
-        has_assigned_language = self.track["language"] and self.track["language"] != "und"
+        # Verificar si ya tiene idioma asignado y, si es así, convertirlo a ISO 639-2
+        has_assigned_language = bool(original_language) and original_language != "und"
         if has_assigned_language:
-            print(f"  ℹ️  Pista ya tiene idioma asignado: {self.track['language']}")
-            print(f"  🔍 Verificando idioma con {NUM_SAMPLES} muestreos...")
+            track_result["original_language_iso"] = WHISPER_TO_ISO639_2.get(original_language, original_language)
+            print(f"  ℹ️  Pista ya tiene idioma asignado: {original_language}")
+            print(f"  🔍 Verificando idioma con hasta {NUM_SAMPLES} muestreos...")
         else:
-            print(f"  🔍 Pista sin idioma asignado, realizando {NUM_SAMPLES} muestreos...")
-
-        all_detections = []  # Lista de tuplas (idioma, confianza, transcripcion)
+            print(f"  🔍 Pista sin idioma asignado, realizando hasta {NUM_SAMPLES} muestreos...")
+
+        all_detections = []  # Lista de tuplas (idioma, confianza, audio con voz)
+
+        # Las muestras de todas las pistas se extraen con una sola invocación de ffmpeg (ver VideoProcessor)
+        start_times = [self.__get_sample_start_time(sample_num) for sample_num in range(1, NUM_SAMPLES + 1)]
+        audio_samples = self.video_processor.get_audio_samples(track["id"], start_times)
+
+        # Realizar muestreos en dos lotes: si los primeros ya deciden el idioma, los demás no se analizan
+        samples = list(enumerate(zip(start_times, audio_samples), start=1))
+        required_matches = EARLY_STOP_ASSIGNED_MATCHES if has_assigned_language else EARLY_STOP_UNASSIGNED_MATCHES
+        for sample_batch in (samples[:required_matches], samples[required_matches:]):
+            if not sample_batch:
+                continue
+            all_detections += self.__analyze_samples(sample_batch)
+            if self.__is_sampling_decided(all_detections, has_assigned_language):
+                skipped_samples = NUM_SAMPLES - self.total_samples_attempted
+                if skipped_samples:
+                    print(f"\n  ⏩ Idioma ya decidido con {len(all_detections)} muestreo(s), se omiten los {skipped_samples} restantes")
+                break
 
-        # Realizar muestreos
-        for sample_num in range(1, NUM_SAMPLES + 1):
-            self.total_samples_attempted += 1
-            detection = self.__process_single_sample(sample_num)
-            if detection:
-                all_detections.append(detection)
-                self.valid_samples_count += 1
+        # Liberar el PCM y el audio con voz de los muestreos antes de un posible análisis extendido; solo
+        # sobreviven los audios que referencian las detecciones (y únicamente si hay que transcribir)
+        del samples, audio_samples
+        self._vad_cache.clear()
 
         # Procesar resultados
-        detected_lang, confidence, final_transcription = self.__process_detections(all_detections, has_assigned_language)
+        detected_lang, confidence, best_audio = self.__process_detections(all_detections, has_assigned_language)
+
+        # Transcribir solo el audio del muestreo elegido (únicamente si se necesita, en modo debug)
+        final_transcription = self.__transcribe(best_audio, detected_lang) if detected_lang and best_audio is not None else ""
 
         # Agregar estadísticas del análisis
         track_result["analysis_stats"] = {
@@ -190,109 +205,165 @@ class TrackAnalyzer:
             track_result["transcription"] = final_transcription
 
             # Determinar si necesita revisión
-            if not self.track["language"] or self.track["language"] == "und":
+            if not has_assigned_language:
                 track_result["needs_review"] = True
                 print(f"  📝 Pista SIN idioma -> Se debería asignar: {detected_lang} ({iso_lang_2})")
-            elif self.track["language"] == detected_lang:
+            elif original_language == detected_lang:
                 print("  ✅ Idioma asignado coincide con el detectado")
                 track_result["needs_review"] = False
             else:
-                print(f"  ⚠️  Idioma asignado ({self.track['language']}) difiere del detectado ({detected_lang})")
+                print(f"  ⚠️  Idioma asignado ({original_language}) difiere del detectado ({detected_lang})")
                 track_result["needs_review"] = True
-        elif self.track["language"] in NO_LANGUAGE_CODES:
-            print(f"\n  ✅ La pista está marcada como sin idioma ({self.track['language']}) y no se detectó ninguno")
+        elif original_language in NO_LANGUAGE_CODES:
+            print(f"\n  ✅ La pista está marcada como sin idioma ({original_language}) y no se detectó ninguno")
         else:
             track_result["needs_review"] = True
             print("\n  ❌ No se pudo detectar el idioma")
 
         return track_result
 
-    def __process_single_sample(self, sample_num: int) -> Optional[Tuple[str, float, str]]:
+    def __get_sample_start_time(self, sample_num: int) -> int:
+        """Calcula el tiempo de inicio (en segundos) del muestreo indicado (1-indexed)."""
+        if not self.video_duration or self.video_duration <= SAMPLE_DURATION:
+            return 0
+
+        start_time = int(self.video_duration * SAMPLE_POSITIONS[sample_num - 1])
+        if start_time + SAMPLE_DURATION > self.video_duration:
+            start_time = max(0, int(self.video_duration - SAMPLE_DURATION))
+        return start_time
+
+    def __analyze_samples(self, samples: List[Tuple[int, Tuple[int, Optional[bytes]]]]) -> List[Tuple[str, float, Optional[np.ndarray]]]:
         """
-        Procesa un único muestreo del audio de la pista.
+        Aplica el VAD a un lote de muestreos y detecta el idioma de todos los válidos en una sola llamada.
+
+        Args:
+            samples: Lista de tuplas (número de muestreo, (tiempo de inicio, PCM extraído))
+
+        Returns:
+            Lista de tuplas (idioma, confianza, audio con voz) de los muestreos válidos
+        """
+        prepared_samples = []  # Lista de tuplas (número de muestreo, audio con voz)
+        for sample_num, (start_time, audio_sample) in samples:
+            self.total_samples_attempted += 1
+            audio = self.__prepare_sample(sample_num, start_time, audio_sample)
+            if audio is not None:
+                prepared_samples.append((sample_num, audio))
+
+        # Los muestreos de una misma ventana comparten el array de audio: se detecta una sola vez por ventana
+        unique_audios = list({id(audio): audio for _, audio in prepared_samples}.values())
+        detections = {}  # {id del audio: (idioma, confianza)}
+        if unique_audios:
+            print(f"\n  🔍 Detectando idioma de {len(unique_audios)} muestreo(s) en lote...")
+            detections = dict(zip(map(id, unique_audios), detect_language_batch(unique_audios, self.whisper_model)))
+
+        valid_detections = []
+        for sample_num, audio in prepared_samples:
+            detected_lang, confidence = detections[id(audio)]
+            detection = self.__validate_detection(sample_num, audio, detected_lang, confidence)
+            if detection:
+                valid_detections.append(detection)
+                self.valid_samples_count += 1
+        return valid_detections
+
+    def __is_sampling_decided(self, all_detections: List[Tuple[str, float, Optional[np.ndarray]]], has_assigned_language: bool) -> bool:
+        """
+        Indica si los muestreos hechos hasta ahora ya determinan el resultado, de modo que los restantes no lo cambiarían.
+
+        Con idioma asignado basta con EARLY_STOP_ASSIGNED_MATCHES muestreos que lo confirmen; sin él, hacen falta
+        EARLY_STOP_UNASSIGNED_MATCHES muestreos del mismo idioma (las detecciones ya superan MIN_CONFIDENCE).
+        """
+        if has_assigned_language:
+            assigned_language = self.track["language"]
+            matches = sum(1 for lang, conf, _ in all_detections if lang == assigned_language and conf >= MIN_CONFIDENCE)
+            return matches >= EARLY_STOP_ASSIGNED_MATCHES
+
+        language_counts = Counter(lang for lang, _, _ in all_detections)
+        return bool(language_counts) and max(language_counts.values()) >= EARLY_STOP_UNASSIGNED_MATCHES
+
+    def __prepare_sample(self, sample_num: int, start_time: int, audio_sample: Optional[bytes]) -> Optional[np.ndarray]:
+        """
+        Aplica el VAD a un único muestreo del audio de la pista.
 
         Args:
             sample_num: Número del muestreo (1-indexed)
+            start_time: Tiempo de inicio de la muestra en segundos
+            audio_sample: PCM extraído para la muestra, o None si falló la extracción
 
         Returns:
-            Tupla (idioma, confianza, transcripción) si el muestreo es válido, None si se rechaza
+            Audio con voz del muestreo, o None si se rechaza
         """
         print(f"\n  🔄 Muestreo {sample_num}/{NUM_SAMPLES}")
 
-        # Calcular tiempo de inicio para esta muestra
         if self.video_duration and self.video_duration > SAMPLE_DURATION:
-            position_percent = SAMPLE_POSITIONS[sample_num - 1]
-            start_time = int(self.video_duration * position_percent)
-            if start_time + SAMPLE_DURATION > self.video_duration:
-                start_time = max(0, int(self.video_duration - SAMPLE_DURATION))
-            print(f"  📍 Extrayendo desde {position_percent:.0%} del video (tiempo: {start_time}s)")
+            print(f"  📍 Muestra desde {SAMPLE_POSITIONS[sample_num - 1]:.0%} del video (tiempo: {start_time}s)")
         else:
-            start_time = 0
-            print("  📍 Video corto, extrayendo desde el inicio")
-
-        # Extraer muestra de audio
-        audio_sample = self.audio_tools.extract_audio_sample(self.track["id"], SAMPLE_DURATION, start_time)
+            print("  📍 Video corto, muestra desde el inicio")
 
         if not audio_sample:
             print(f"  ⚠️  No se pudo extraer audio en el muestreo {sample_num}")
             return None
 
+        cache_key = (start_time, SAMPLE_DURATION)
+        if cache_key in self._vad_cache:
+            print(f"  ♻️  Misma ventana que un muestreo anterior, se reutiliza su VAD (tiempo: {start_time}s)")
+            return self._vad_cache[cache_key]
+
+        # Aplicar VAD para filtrar silencios y ruido
+        audio, voice_percentage = self.audio_tools.apply_vad(audio_sample)
+
+        # Si no hay suficiente voz, omitir este muestreo
+        if audio is None:
+            print(f"  ❌  Muestreo rechazado por falta de voz ({voice_percentage:.1f}%)")
+        self._vad_cache[cache_key] = audio
+        return audio
+
+    def __validate_detection(
+        self, sample_num: int, audio: np.ndarray, detected_lang: str, confidence: float
+    ) -> Optional[Tuple[str, float, Optional[np.ndarray]]]:
+        """
+        Valida la detección de idioma de un muestreo.
+
+        Args:
+            sample_num: Número del muestreo (1-indexed)
+            audio: Audio con voz del muestreo ya decodificado
+            detected_lang: Idioma detectado en el muestreo
+            confidence: Confianza de la detección
+
+        Returns:
+            Tupla (idioma, confianza, audio con voz o None si no se transcribe) si el muestreo es válido, None si se rechaza
+        """
+        print(f"\n  🔄 Muestreo {sample_num}: {detected_lang} (confianza: {confidence:.2%})")
+
+        # Rechazar si la confianza es muy baja
+        if confidence < MIN_CONFIDENCE:
+            print(f"  ❌  Confianza muy baja ({confidence:.2%}), descartando muestreo")
+            return None
+
+        # Retornar detección válida; el audio solo se conserva si hay que transcribir después el muestreo elegido
+        return (detected_lang, confidence, audio if self.need_transcription else None)
+
+    def __transcribe(self, audio: np.ndarray, language: str) -> str:
+        """Transcribe el audio elegido si se necesita la transcripción (modo debug); devuelve '' si no o si falla."""
         try:
-            # Aplicar VAD para filtrar silencios y ruido
-            vad_audio, voice_percentage = self.audio_tools.apply_vad(audio_sample)
-
-            # Si no hay suficiente voz, omitir este muestreo
-            if not vad_audio:
-                print(f"  ❌  Muestreo rechazado por falta de voz ({voice_percentage:.1f}%)")
-                return None
-
-            # Detectar idioma (el modelo ya está cargado en VideoProcessor)
-            detected_lang, confidence = detect_language_with_loaded_model(vad_audio, self.whisper_model)
-
-            # Obtener transcripción solo en modo debug
-            transcription = ""
-            if self.debug:
-                try:
-                    transcription = transcribe_with_loaded_model(vad_audio, self.whisper_model, language=detected_lang)
-                except Exception as e:
-                    print(f"  ⚠️ [DEBUG] Omitiendo transcripción por error: {e}")
-                    transcription = ""
-
-            # Rechazar si la confianza es muy baja
-            if confidence < MIN_CONFIDENCE:
-                print(f"  ❌  Confianza muy baja ({confidence:.2%}), descartando muestreo")
-                return None
-
-            # # Si la transcripción está vacía (por alucinación o error), descartar muestreo
-            # if not transcription:
-            #     print("  ❌  Muestreo descartado: transcripción vacía o alucinación detectada")
-            #     return None
-
-            # Retornar detección válida
-            return (detected_lang, confidence, transcription)
-
-        finally:
-            # Limpiar archivos temporales
-            if not self.debug:
-                if os.path.exists(audio_sample):
-                    os.remove(audio_sample)
-                if vad_audio and vad_audio != audio_sample and os.path.exists(vad_audio):
-                    os.remove(vad_audio)
+            return transcribe_with_loaded_model(audio, self.transcription_model, language=language, need_transcription=self.need_transcription)
+        except Exception as e:
+            print(f"  ⚠️ [DEBUG] Omitiendo transcripción por error: {e}")
+            return ""
 
     def __process_detections(
         self,
-        all_detections: List[Tuple[str, float, str]],
+        all_detections: List[Tuple[str, float, Optional[np.ndarray]]],
         has_assigned_language: bool,
-    ) -> Tuple[Optional[str], float, str]:
+    ) -> Tuple[Optional[str], float, Optional[np.ndarray]]:
         """
         Procesa los resultados de las detecciones y determina el idioma final.
 
         Args:
-            all_detections: Lista de tuplas (idioma, confianza, transcripción)
+            all_detections: Lista de tuplas (idioma, confianza, audio con voz)
             has_assigned_language: Si la pista tiene idioma asignado
 
         Returns:
-            Tupla (detected_lang, confidence, transcription)
+            Tupla (detected_lang, confidence, audio con voz del resultado elegido)
         """
         # Si no hay ninguna detección válida, realizar análisis extendido
         if not all_detections:
@@ -310,51 +381,53 @@ class TrackAnalyzer:
 
     def __process_with_assigned_language(
         self,
-        all_detections: List[Tuple[str, float, str]],
-    ) -> Tuple[Optional[str], float, str]:
+        all_detections: List[Tuple[str, float, Optional[np.ndarray]]],
+    ) -> Tuple[Optional[str], float, Optional[np.ndarray]]:
         """Procesa detecciones cuando la pista ya tiene idioma asignado."""
-        print(f"\n  📊 Analizando resultados de los {NUM_SAMPLES} muestreos...")
+        print(f"\n  📊 Analizando resultados de los {len(all_detections)} muestreo(s) válido(s)...")
 
         # Buscar si algún muestreo coincide con el idioma asignado con confianza aceptable
-        matching_detections = [(lang, conf, text) for lang, conf, text in all_detections if lang == self.track["language"] and conf >= MIN_CONFIDENCE]
+        assigned_language = self.track["language"]
+        matching_detections = [(lang, conf, audio) for lang, conf, audio in all_detections if lang == assigned_language and conf >= MIN_CONFIDENCE]
 
         if matching_detections:
             # Al menos uno coincide con confianza aceptable
             detected_lang = self.track["language"]
             best_match = max(matching_detections, key=lambda t: t[1])
             confidence = best_match[1]
-            final_transcription = best_match[2]
+            best_audio = best_match[2]
             print(f"  ✅ {len(matching_detections)} muestreo(s) coinciden con idioma asignado '{detected_lang}'")
             print(f"  🎯 Usando idioma asignado (máxima confianza: {confidence:.2%})")
             self.analysis_method = "sampling"
-            return detected_lang, confidence, final_transcription
+            return detected_lang, confidence, best_audio
         else:
             # Ninguno coincide con confianza aceptable -> Analizar casi toda la pista
             print(f"  ⚠️  Ningún muestreo coincide con idioma asignado '{self.track['language']}' " f"con confianza aceptable")
 
             self.analysis_method = "extended"
-            detected_lang, confidence, transcription = self.__perform_extended_analysis()
+            detected_lang, confidence, best_audio = self.__perform_extended_analysis()
             if not detected_lang:
                 print("  ❌ No se pudo realizar análisis extendido")
-            return detected_lang, confidence, transcription or ""
+            return detected_lang, confidence, best_audio
 
     def __process_without_assigned_language(
         self,
-        all_detections: List[Tuple[str, float, str]],
-    ) -> Tuple[Optional[str], float, str]:
+        all_detections: List[Tuple[str, float, Optional[np.ndarray]]],
+    ) -> Tuple[Optional[str], float, Optional[np.ndarray]]:
         """Procesa detecciones cuando la pista no tiene idioma asignado."""
-        print(f"\n  📊 Determinando idioma más probable de los {NUM_SAMPLES} muestreos...")
+        print(f"\n  📊 Determinando idioma más probable de los {len(all_detections)} muestreo(s) válido(s)...")
 
         # Contar frecuencia de cada idioma
-        language_scores = {}  # {idioma: puntuación}
-
-        for lang, conf, text in all_detections:
-            if lang not in language_scores:
-                language_scores[lang] = {"count": 0, "total_confidence": 0, "max_confidence": 0}
+        language_scores = defaultdict(lambda: {"count": 0, "total_confidence": 0.0, "max_confidence": -math.inf, "best_audio": None})
 
-            language_scores[lang]["count"] += 1
-            language_scores[lang]["total_confidence"] += conf
-            language_scores[lang]["max_confidence"] = max(language_scores[lang]["max_confidence"], conf)
+        # Una sola pasada: junto a la confianza máxima se guarda su audio (el primero si hay empate)
+        for lang, conf, audio in all_detections:
+            scores = language_scores[lang]
+            scores["count"] += 1
+            scores["total_confidence"] += conf
+            if conf > scores["max_confidence"]:
+                scores["max_confidence"] = conf
+                scores["best_audio"] = audio
 
         # Calcular puntuación combinada
         for lang, scores in language_scores.items():
@@ -374,19 +447,15 @@ class TrackAnalyzer:
         confidence = language_scores[best_lang]["max_confidence"]
         print(f"  🎯 Idioma más probable de muestreos: {detected_lang} (confianza máxima: {confidence:.2%})")
 
-        # Seleccionar la transcripción asociada a la confianza máxima para ese idioma
-        best_text = ""
-        for lang, conf, text in all_detections:
-            if lang == best_lang and conf == language_scores[best_lang]["max_confidence"]:
-                best_text = text
-                break
-        final_transcription = best_text
+        # Audio asociado a la confianza máxima para ese idioma
+        best_audio = language_scores[best_lang]["best_audio"]
 
         # Si la confianza no es aceptable, hacer análisis semicompleto
         if confidence < MIN_CONFIDENCE:
             print(f"  ⚠️  Confianza insuficiente ({confidence:.2%} < {MIN_CONFIDENCE:.0%})")
-            detected_lang, confidence, transcription = self.__perform_extended_analysis()
-            final_transcription = transcription or final_transcription
+            detected_lang, confidence, extended_audio = self.__perform_extended_analysis()
+            if extended_audio is not None:
+                best_audio = extended_audio
             if not detected_lang:
                 print("  ⚠️  No se pudo realizar análisis extendido, usando mejor resultado de muestreos")
                 self.analysis_method = "sampling"
@@ -397,4 +466,4 @@ class TrackAnalyzer:
             print("  ✅ Confianza aceptable, usando resultado de muestreos")
             self.analysis_method = "sampling"
 
-        return detected_lang, confidence, final_transcription
+        return detected_lang, confidence, best_audio
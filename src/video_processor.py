@@ -2,21 +2,62 @@
 Lógica principal de procesamiento de videos y análisis de pistas de audio.
 """
 
+import io
+import itertools
 import os
-from typing import Any, Dict, Optional
-
-from whisper.model import Whisper
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Sequence, TextIO, Tuple
 
 from .audio_tools import AudioTools
-from .config import get_temp_dir
-from .language_detector import load_whisper_model
+from .config import MAX_PARALLEL_TRACKS, SAMPLE_DURATION, get_temp_dir
+from .language_detector import LoadedWhisperModel, load_whisper_model
 from .track_analyzer import TrackAnalyzer
 
 
+class _TrackLogRouter(io.TextIOBase):
+    """
+    Sustituto de sys.stdout que guarda en un buffer propio lo que escribe cada hilo de análisis de pistas.
+
+    Las pistas se analizan en paralelo: sin esto, los mensajes de unas y otras se intercalarían.
+    Lo que escriben los hilos sin buffer (p.ej. el principal) pasa directamente a la salida original.
+    """
+
+    def __init__(self, stream: TextIO):
+        self.stream = stream
+        self._local = threading.local()
+
+    def write(self, text: str) -> int:
+        buffer = getattr(self._local, "buffer", None)
+        return (buffer or self.stream).write(text)
+
+    def flush(self) -> None:
+        if getattr(self._local, "buffer", None) is None:
+            self.stream.flush()
+
+    @contextmanager
+    def capture(self) -> Iterator[io.StringIO]:
+        """Desvía al buffer devuelto todo lo que escriba el hilo actual dentro del bloque."""
+        self._local.buffer = buffer = io.StringIO()
+        try:
+            yield buffer
+        finally:
+            self._local.buffer = None
+
+
 class VideoProcessor:
     """Clase para procesar videos y detectar idiomas en pistas de audio."""
 
-    def __init__(self, video_path: str, model: str = "base", debug: bool = False):
+    def __init__(
+        self,
+        video_path: str,
+        model: str = "base",
+        debug: bool = False,
+        lang_detect_model: Optional[str] = None,
+        whisper_model: Optional[LoadedWhisperModel] = None,
+    ):
         """
         Inicializa el procesador de video.
 
@@ -24,6 +65,10 @@ class VideoProcessor:
             video_path: Ruta al archivo de video a procesar
             model: Nombre del modelo Whisper a usar
             debug: Si es True, no borra archivos temporales y muestra sus rutas
+            lang_detect_model: Modelo para la detección de idioma (por defecto, el mismo que model).
+                               Con uno distinto, model solo se usa para las transcripciones de debug
+            whisper_model: Modelo ya cargado para la detección de idioma, para compartirlo entre varios videos.
+                           Si no se indica, se carga lang_detect_model (una sola vez por proceso)
         """
 
         if not os.path.exists(video_path):
@@ -32,12 +77,23 @@ class VideoProcessor:
 
         self.video_path = video_path
         self.model = model
+        self.lang_detect_model = lang_detect_model or model
         self.debug = debug
-        self.temp_dir = get_temp_dir()  # Directorio temporal único para esta ejecución
-        self.whisper_model: Optional[Whisper] = None
+        # Solo se muestran transcripciones en modo debug; fuera de él basta con la detección de idioma
+        self.need_transcription = debug
+        # Directorio temporal único para esta ejecución; solo el modo debug escribe archivos (el audio se
+        # procesa en memoria), así que fuera de él no se crea
+        self.temp_dir: Optional[str] = get_temp_dir() if debug else None
+        self.whisper_model: Optional[LoadedWhisperModel] = whisper_model  # Modelo para detectar el idioma
+        self.transcription_model: Optional[LoadedWhisperModel] = None  # Modelo para transcribir (modo debug)
         self.audio_tools = AudioTools(video_path, debug=debug, temp_dir=self.temp_dir)
         self.video_duration: Optional[float] = self.audio_tools.get_video_duration()
 
+        # Muestras de audio de todas las pistas a analizar, extraídas juntas la primera vez que se piden
+        self._sampled_track_ids: List[int] = []
+        self._audio_samples: Optional[Dict[int, List[Optional[bytes]]]] = None
+        self._audio_samples_lock = threading.Lock()
+
         if debug:
             print(f"  🐛 [DEBUG] Directorio temporal: {self.temp_dir}")
 
@@ -58,23 +114,84 @@ class VideoProcessor:
         if self.video_duration:
             print(f"📏 Duración del video: {self.video_duration:.1f}s\n")
 
-        # Cargar modelo Whisper
-        print(f"🔄 Cargando modelo Whisper '{self.model}'...")
-        self.whisper_model = load_whisper_model(self.model)
-        print(f"✅ Modelo Whisper '{self.model}' cargado correctamente\n")
+        # Las pistas ignoradas no usan el modelo: si todas lo son, no hace falta cargarlo
+        if all(track.get("should_ignore") for track in audio_tracks):
+            print("ℹ️  Todas las pistas están marcadas para ignorar, no se carga el modelo Whisper\n")
+        else:
+            self.__load_models()
+
+        # Pistas cuyas muestras se extraen juntas (las ignoradas no se muestrean)
+        self._sampled_track_ids = [track["id"] for track in audio_tracks if not track.get("should_ignore")]
 
         # Resultado a devolver
         result = {"file": self.video_path, "duration": self.video_duration, "audio_tracks": []}
 
-        # Procesar todas las pistas de audio
-        for track in audio_tracks:
-            # Crear analizador para esta pista específica
-            track_analyzer = TrackAnalyzer(track, self)
-            track_result = track_analyzer.analyze()
-            result["audio_tracks"].append(track_result)
+        # Procesar todas las pistas de audio, varias a la vez: el modelo es compartido (language_detector
+        # serializa su uso), pero la extracción y el VAD de una pista se solapan con la inferencia de otra.
+        # El log de cada pista se acumula aparte y se muestra completo, en el orden de las pistas
+        log_router = _TrackLogRouter(sys.stdout)
+        sys.stdout = log_router
+        try:
+            with ThreadPoolExecutor(max_workers=max(1, min(len(audio_tracks), MAX_PARALLEL_TRACKS))) as executor:
+                for track_result, track_log in executor.map(self.__analyze_track, audio_tracks, itertools.repeat(log_router)):
+                    log_router.stream.write(track_log)
+                    log_router.stream.flush()
+                    result["audio_tracks"].append(track_result)
+        finally:
+            sys.stdout = log_router.stream
 
         print(f"\n{'=' * 80}")
         print("✅ Detección completada")
         print(f"{'=' * 80}\n")
 
         return result
+
+    def __load_models(self) -> None:
+        """Carga el modelo de detección (salvo que se haya recibido ya cargado) y, en modo debug, el de transcripción."""
+        if self.whisper_model is None:
+            print(f"🔄 Cargando modelo Whisper '{self.lang_detect_model}'...")
+            self.whisper_model = load_whisper_model(self.lang_detect_model)
+            print(f"✅ Modelo Whisper '{self.lang_detect_model}' cargado correctamente\n")
+
+        # Las transcripciones solo se hacen en modo debug: el modelo de transcripción solo se carga entonces
+        self.transcription_model = self.whisper_model
+        if self.need_transcription and self.model != self.lang_detect_model:
+            print(f"🔄 Cargando modelo Whisper de transcripción '{self.model}'...")
+            self.transcription_model = load_whisper_model(self.model)
+
+    def get_audio_samples(self, audio_track_id: int, start_times: Sequence[int]) -> List[Optional[bytes]]:
+        """
+        Devuelve las muestras de audio de una pista.
+
+        La primera llamada extrae con un único proceso ffmpeg las muestras de todas las pistas a analizar:
+        las posiciones de muestreo solo dependen de la duración del video, así que son las mismas para
+        todas, y cada ventana del contenedor se lee una sola vez. Cada pista recoge después las suyas.
+
+        Args:
+            audio_track_id: Índice de la pista de audio (0:a:X)
+            start_times: Tiempos de inicio de cada muestra en segundos
+
+        Returns:
+            Lista con el PCM (s16le) de cada muestra en el orden de start_times, None en las que fallen
+        """
+        with self._audio_samples_lock:
+            if self._audio_samples is None:
+                track_ids = self._sampled_track_ids or [audio_track_id]
+                self._audio_samples = self.audio_tools.extract_tracks_audio_samples(track_ids, start_times, SAMPLE_DURATION)
+            # Se retiran al entregarlas para no retener en memoria las de pistas ya analizadas
+            audio_samples = self._audio_samples.pop(audio_track_id, None)
+
+        if audio_samples is None:
+            return self.audio_tools.extract_audio_samples(audio_track_id, start_times, SAMPLE_DURATION)
+        return audio_samples
+
+    def __analyze_track(self, track: Dict[str, Any], log_router: _TrackLogRouter) -> Tuple[Dict[str, Any], str]:
+        """Crea el analizador para una pista específica y devuelve su resultado junto con su log."""
+        with log_router.capture() as track_log:
+            try:
+                track_result = TrackAnalyzer(track, self).analyze()
+            except BaseException:
+                # Si el análisis falla, su log se muestra igualmente antes de propagar el error
+                log_router.stream.write(track_log.getvalue())
+                raise
+        return track_result, track_log.getvalue()
@@ -0,0 +1,45 @@
+"""
+Pruebas de AudioTools sobre salidas de ffprobe simuladas (no requieren ffprobe ni archivos de video).
+"""
+
+from src.audio_tools import AudioTools
+
+
+def make_audio_tools(streams):
+    """Crea un AudioTools con la salida de ffprobe ya resuelta, sin lanzar ffprobe."""
+    audio_tools = AudioTools("/tmp/inexistente.mkv")
+    audio_tools.__dict__["_probe"] = {"streams": streams, "format": {}}
+    return audio_tools
+
+
+def test_missing_language_tag_is_reported_as_und():
+    streams = [
+        {"index": 1, "codec_type": "audio", "codec_name": "aac", "channels": 2, "tags": {"language": "spa"}},
+        {"index": 2, "codec_type": "audio", "codec_name": "aac", "channels": 2},
+        {"index": 3, "codec_type": "audio", "codec_name": "aac", "channels": 2, "tags": {"language": ""}},
+    ]
+
+    tracks = make_audio_tools(streams).get_audio_tracks()
+
+    assert [track["language"] for track in tracks] == ["es", "und", "und"]
+
+
+def test_normalize_language_accepts_bibliographic_codes():
+    assert AudioTools.normalize_language("FRE") == "fr"
+    assert AudioTools.normalize_language("scr") == "hr"
+    assert AudioTools.normalize_language("und") == "und"
+
+
+def test_codec_uses_mediainfo_format_names():
+    streams = [
+        {"index": 1, "codec_type": "audio", "codec_name": "ac3"},
+        {"index": 2, "codec_type": "audio", "codec_name": "dts", "profile": "DTS"},
+        {"index": 3, "codec_type": "audio", "codec_name": "dts", "profile": "DTS-HD MA"},
+        {"index": 4, "codec_type": "audio", "codec_name": "truehd"},
+        {"index": 5, "codec_type": "audio", "codec_name": "pcm_s24le"},
+    ]
+
+    tracks = make_audio_tools(streams).get_audio_tracks()
+
+    assert [track["codec"] for track in tracks] == ["AC-3", "DTS", "DTS XLL", "MLP FBA", "PCM"]
+    assert [track["stream_order"] for track in tracks] == ["1", "2", "3", "4", "5"]
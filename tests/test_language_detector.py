@@ -0,0 +1,24 @@
+"""
+Pruebas de las utilidades de language_detector que no necesitan un modelo Whisper cargado.
+"""
+
+from src.language_detector import is_transcription_repetitive
+
+
+def test_consecutive_repetition_is_detected():
+    assert is_transcription_repetitive("ok vale ok vale ok vale es bonita hoy")
+
+
+def test_repetition_matches_whole_words_only():
+    # "vale" no coincide con el prefijo de "valencia", ni "cat" con el de "catalog"
+    assert not is_transcription_repetitive("ok vale ok vale ok valencia es bonita hoy")
+    assert not is_transcription_repetitive("the cat the cat the catalog is here now yes")
+
+
+def test_dominant_phrase_is_detected():
+    assert is_transcription_repetitive("gracias por ver el video hola gracias por ver el video adios gracias por ver el video")
+
+
+def test_short_or_varied_text_is_not_repetitive():
+    assert not is_transcription_repetitive("hola que tal")
+    assert not is_transcription_repetitive("el perro corre por el parque mientras los niños juegan al sol")
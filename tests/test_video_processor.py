@@ -0,0 +1,40 @@
+"""
+Pruebas del reparto de la salida estándar entre los hilos de análisis de pistas.
+"""
+
+import io
+import threading
+
+from src.video_processor import _TrackLogRouter
+
+
+def test_track_log_router_buffers_each_thread_separately():
+    stream = io.StringIO()
+    router = _TrackLogRouter(stream)
+    logs = {}
+    both_started = threading.Barrier(2)
+
+    def analyze(track_id):
+        with router.capture() as track_log:
+            print(f"pista {track_id}: inicio", file=router)
+            both_started.wait()
+            print(f"pista {track_id}: fin", file=router)
+        logs[track_id] = track_log.getvalue()
+
+    threads = [threading.Thread(target=analyze, args=(track_id,)) for track_id in (0, 1)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert logs == {0: "pista 0: inicio\npista 0: fin\n", 1: "pista 1: inicio\npista 1: fin\n"}
+    assert stream.getvalue() == ""
+
+
+def test_track_log_router_passes_through_outside_capture():
+    stream = io.StringIO()
+    router = _TrackLogRouter(stream)
+
+    print("sin buffer", file=router)
+
+    assert stream.getvalue() == "sin buffer\n"